@@ -0,0 +1,100 @@
+import time
+
+class SearchAnimation:
+    # Steps through a search generator from the Tk event loop using after(), so
+    # the window stays responsive while a search is animated. With a delay of 0
+    # the search runs as fast as it can, but hands control back to the event loop
+    # every frame. Redraws are capped at max_fps: when steps come faster than
+    # that, several of them are folded into one frame.
+    def __init__(self, widget, steps, on_step, on_frame, on_finish, delay=1000, max_fps=30):
+        self.widget = widget
+        self.steps = steps
+        self.on_step = on_step  # Called with every value the generator yields
+        self.on_frame = on_frame  # Called once per frame, after its steps
+        self.on_finish = on_finish  # Called with True when the search ran to the end, False if cancelled
+        self.delay = delay  # Milliseconds between steps
+        self.max_fps = max_fps
+        self.paused = False
+        self.done = False
+        self.after_id = None
+
+    @property
+    def running(self):
+        return not self.done
+
+    def start(self):
+        self._schedule(0)
+
+    def set_delay(self, delay):
+        self.delay = max(0, delay)
+
+    def pause(self):
+        self.paused = True
+        self._unschedule()
+
+    def resume(self):
+        if self.paused and not self.done:
+            self.paused = False
+            self._schedule(0)
+
+    def step(self):
+        # Single-step while paused
+        if self.paused and not self.done and self._advance():
+            self.on_frame()
+
+    def cancel(self):
+        if not self.done:
+            self.done = True
+            self._unschedule()
+            self.steps.close()
+            self.on_finish(False)
+
+    def finish(self):
+        # Jump to the result: run the remaining steps without drawing any frames in between
+        self._unschedule()
+        while self._advance():
+            pass
+
+    def _schedule(self, delay):
+        self.after_id = self.widget.after(delay, self._tick)
+
+    def _unschedule(self):
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _advance(self):
+        if self.done:
+            return False
+        try:
+            step = next(self.steps)
+        except StopIteration:
+            self.done = True
+            self._unschedule()
+            self.on_frame()
+            self.on_finish(True)
+            return False
+        self.on_step(step)
+        return True
+
+    def _tick(self):
+        self.after_id = None
+        if self.done or self.paused:
+            return
+
+        frame_ms = 1000 / self.max_fps
+        if self.delay <= 0:
+            # Spend about half a frame searching, then let Tk draw and handle events
+            deadline = time.perf_counter() + frame_ms / 2000
+            while time.perf_counter() < deadline:
+                if not self._advance():
+                    return
+            self.on_frame()
+            self._schedule(1)
+        else:
+            steps_per_frame = max(1, round(frame_ms / self.delay))
+            for _ in range(steps_per_frame):
+                if not self._advance():
+                    return
+            self.on_frame()
+            self._schedule(int(self.delay * steps_per_frame))
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from search_engine import ResultCache, search
+
+# Batch mode: run many (start, goal, algorithm) queries against one graph on a
+# process pool. The graph is handed to each worker once, through the pool
+# initializer (inherited copy-on-write where the OS forks), never per task.
+# Jobs refer to nodes by label so they stay valid in every worker process.
+
+_graph = None
+_nodes_by_label = None
+_cache = None  # Repeated jobs in the same worker are answered from here
+# It holds BatchResults rather than SearchResults: a SearchResult keeps its visited
+# set, which for a large search is megabytes that no batch result ever reads.
+
+class BatchResult:
+    # Compact, picklable summary of one query's SearchResult
+    def __init__(self, job, result=None, error=None, graph=None):
+        self.job = job
+        self.path = [graph.label(node) for node in result.path] if result and result.found else None
+        self.path_cost = result.path_cost if result else 0
+        self.expansions = result.expansions if result else 0
+        self.generated = result.generated if result else 0
+        self.duplicates = result.duplicates if result else 0
+        self.pruned = result.pruned if result else 0
+        self.max_queue_size = result.max_queue_size if result else 0
+        self.timings = dict(result.timings) if result else {}
+        self.error = error
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    def as_dict(self):
+        # JSON-ready form, as printed by the command line and sent by query_server
+        start_label, goal_label, algorithm = self.job[:3]
+        return {
+            'start': start_label,
+            'goal': goal_label,
+            'algorithm': algorithm,
+            'path': self.path,
+            'path_cost': self.path_cost,
+            'expansions': self.expansions,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'pruned': self.pruned,
+            'max_queue_size': self.max_queue_size,
+            'timings': self.timings,
+            'error': self.error,
+        }
+
+def _init_worker(graph):
+    global _graph, _nodes_by_label, _cache
+    _graph = graph
+    _nodes_by_label = {graph.label(node): node for node in graph}
+    _cache = ResultCache()
+
+def _run_job(job):
+    start_label, goal_label, algorithm = job[:3]
+    options = job[3] if len(job) > 3 else {}
+    start = _nodes_by_label.get(start_label)
+    goal = _nodes_by_label.get(goal_label)
+    if start is None or goal is None:
+        raise ValueError(f"Unknown node label in job {job!r}")
+    result = _cache.get(_graph, start, goal, algorithm, **options)
+    if result is None:
+        result = BatchResult(job, search(_graph, start, goal, algorithm, **options), graph=_graph)
+        _cache.put(_graph, start, goal, algorithm, result, **options)
+    return result
+
+def _run_chunk(jobs):
+    results = []
+    for job in jobs:
+        try:
+            results.append(_run_job(job))
+        except (ValueError, TypeError) as error:
+            # One bad job should not take the rest of its chunk down with it. Unknown
+            # options, e.g. {'width': 3} for beam_search, raise TypeError.
+            results.append(BatchResult(job, error=str(error)))
+    return results
+
+def run_batch(graph, jobs, workers=None, chunksize=64):
+    # jobs: iterable of (start_label, goal_label, algorithm) or
+    # (start_label, goal_label, algorithm, options) tuples.
+    # Yields a BatchResult per job in the order the jobs finish.
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(graph)
+        for index in range(0, len(jobs), chunksize):
+            yield from _run_chunk(jobs[index:index + chunksize])
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,)) as executor:
+        futures = [executor.submit(_run_chunk, jobs[index:index + chunksize]) for index in range(0, len(jobs), chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+# The optional fourth field of a job line, per algorithm
+NUMERIC_OPTIONS = {
+    'beam_search': 'beam_width',
+    'depth_limited_dfs': 'depth_limit',
+    'iterative_deepening_dfs': 'max_depth',
+}
+
+def read_jobs(file):
+    # One job per line: <start label> <goal label> <algorithm> [option], tab- or space-separated,
+    # where the option is the beam width, depth limit or maximum depth
+    path = getattr(file, 'name', '<jobs>')
+    for line_number, line in enumerate(file, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        fields = line.split('\t') if '\t' in line else line.split()
+        if len(fields) < 3:
+            raise ValueError(f"{path}:{line_number}: expected '<start> <goal> <algorithm> [option]', got {line!r}")
+        option = NUMERIC_OPTIONS.get(fields[2])
+        try:
+            options = {option: int(fields[3])} if len(fields) > 3 and option else {}
+        except ValueError:
+            raise ValueError(f"{path}:{line_number}: {option} must be a whole number, got {fields[3]!r}") from None
+        yield (fields[0], fields[1], fields[2], options)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many start/goal queries against one graph in parallel.")
+    parser.add_argument('graph', help="graph file (edge list or binary CSR)")
+    parser.add_argument('jobs', help="jobs file with one '<start> <goal> <algorithm> [option]' per line, or - for stdin")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=64, help="jobs sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    from graph_io import load_graph
+    graph = load_graph(args.graph)
+
+    if args.jobs == '-':
+        jobs = list(read_jobs(sys.stdin))
+    else:
+        with open(args.jobs, encoding='utf-8') as file:
+            jobs = list(read_jobs(file))
+
+    # Results are printed as JSON lines as soon as their chunk finishes
+    for batch_result in run_batch(graph, jobs, workers=args.workers, chunksize=args.chunksize):
+        print(json.dumps(batch_result.as_dict()), flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from generators import GENERATORS
+from heuristics import clear_heuristic_tables
+from landmarks import get_landmarks
+from search_engine import ALGORITHMS, search
+
+# Headless benchmark harness: generates synthetic graphs, runs the same random
+# start/goal queries through every algorithm and reports nodes expanded, peak
+# frontier size, wall time and peak memory. Reports are JSON or CSV, and two JSON
+# reports can be compared to flag regressions between versions.
+#
+# Wall time is measured on a plain run. Peak memory is measured on a second run
+# under tracemalloc, which slows the search down too much to time it at the same
+# time; pass measure_memory=False (--no-memory) to skip that run.
+#
+# Heuristic tables are cached per goal, and every algorithm answers the same queries,
+# so the cache is emptied before each run: otherwise only the first informed
+# algorithm would pay for the table and the numbers would depend on which algorithms
+# ran before. ALT landmarks are per-graph preprocessing and are picked before timing.
+
+DEFAULT_SIZES = [100, 1000, 10000]
+# The depth-bounded DFS variants re-expand nodes on every pass and are only run when asked for
+DEFAULT_ALGORITHMS = [name for name in ALGORITHMS if name not in ('depth_limited_dfs', 'iterative_deepening_dfs')]
+REPORT_FIELDS = ['family', 'size', 'edges', 'algorithm', 'queries', 'found', 'mean_expanded', 'mean_generated',
+                 'max_frontier', 'mean_path_cost', 'median_time_ms', 'total_time_ms', 'peak_memory_kb']
+
+def run_query(graph, start, goal, algorithm, measure_memory=True, **options):
+    # Returns (result, wall seconds, peak traced bytes or None)
+    clear_heuristic_tables(graph)
+    started = time.perf_counter()
+    result = search(graph, start, goal, algorithm, **options)
+    elapsed = time.perf_counter() - started
+
+    peak = None
+    if measure_memory:
+        clear_heuristic_tables(graph)  # The table counts towards the peak too
+        tracemalloc.start()
+        try:
+            search(graph, start, goal, algorithm, **options)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result, elapsed, peak
+
+def benchmark_graph(graph, family, algorithms, queries=5, seed=0, measure_memory=True, **options):
+    # One report row per algorithm; every algorithm answers the same queries
+    rng = random.Random(seed)
+    nodes = len(graph)
+    pairs = [(rng.randrange(nodes), rng.randrange(nodes)) for _ in range(queries)]
+    rows = []
+    if options.get('heuristic') == 'alt':
+        get_landmarks(graph)
+
+    for algorithm in algorithms:
+        expanded, generated, frontiers, costs, times, peaks, found = [], [], [], [], [], [], 0
+        for start, goal in pairs:
+            result, elapsed, peak = run_query(graph, start, goal, algorithm, measure_memory, **options)
+            expanded.append(result.expansions)
+            generated.append(result.generated)
+            frontiers.append(result.max_queue_size)
+            times.append(elapsed)
+            if peak is not None:
+                peaks.append(peak)
+            if result.found:
+                found += 1
+                costs.append(result.path_cost)
+
+        rows.append({
+            'family': family,
+            'size': nodes,
+            'edges': graph.edge_count,
+            'algorithm': algorithm,
+            'queries': queries,
+            'found': found,
+            'mean_expanded': statistics.fmean(expanded),
+            'mean_generated': statistics.fmean(generated),
+            'max_frontier': max(frontiers),
+            'mean_path_cost': statistics.fmean(costs) if costs else None,
+            'median_time_ms': statistics.median(times) * 1000,
+            'total_time_ms': sum(times) * 1000,
+            'peak_memory_kb': max(peaks) / 1024 if peaks else None,
+        })
+
+    return rows
+
+def run_benchmarks(families=None, sizes=None, algorithms=None, queries=5, seed=0, measure_memory=True,
+                   progress=None, **options):
+    families = families or list(GENERATORS)
+    sizes = sizes or DEFAULT_SIZES
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    for name in families:
+        if name not in GENERATORS:
+            raise ValueError(f"Unknown graph family: {name!r}")
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {name!r}")
+
+    rows = []
+    for family in families:
+        for size in sizes:
+            graph = GENERATORS[family](size, seed=seed)
+            family_rows = benchmark_graph(graph, family, algorithms, queries, seed, measure_memory, **options)
+            rows.extend(family_rows)
+            if progress is not None:
+                for row in family_rows:
+                    progress(row)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'queries': queries,
+        'seed': seed,
+        'options': options,
+        'results': rows,
+    }
+
+def write_report(report, path):
+    # JSON keeps the run settings; CSV is just the result rows
+    if str(path).endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(report['results'])
+    else:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+def compare_reports(baseline, current, threshold=1.2, min_time_ms=1.0):
+    # Rows of current that expand more nodes or run slower than baseline by more than
+    # threshold times. Times below min_time_ms are too noisy to compare.
+    baseline_rows = {(row['family'], row['size'], row['algorithm']): row for row in baseline['results']}
+    regressions = []
+
+    for row in current['results']:
+        old = baseline_rows.get((row['family'], row['size'], row['algorithm']))
+        if old is None:
+            continue
+        checks = [('mean_expanded', 0), ('median_time_ms', min_time_ms), ('peak_memory_kb', 0)]
+        for field, floor in checks:
+            old_value, new_value = old.get(field), row.get(field)
+            if old_value is None or new_value is None or max(old_value, new_value) < floor:
+                continue
+            if new_value > max(old_value, floor) * threshold:
+                regressions.append((row['family'], row['size'], row['algorithm'], field, old_value, new_value))
+
+    return regressions
+
+def _print_row(row):
+    memory = f"{row['peak_memory_kb']:.0f} KiB" if row['peak_memory_kb'] is not None else "-"
+    print(f"{row['family']:>16} {row['size']:>8} {row['algorithm']:>20}  found {row['found']}/{row['queries']}"
+          f"  expanded {row['mean_expanded']:>10.0f}  frontier {row['max_frontier']:>8}"
+          f"  {row['median_time_ms']:>10.2f} ms  {memory}", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search algorithms on synthetic graphs.")
+    parser.add_argument('--families', nargs='+', choices=list(GENERATORS), help="graph families (default: all)")
+    parser.add_argument('--sizes', nargs='+', type=int, help=f"node counts (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS), help="algorithms (default: all but the depth-bounded DFS variants)")
+    parser.add_argument('--queries', type=int, default=5, help="random start/goal queries per graph")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the graphs and the queries")
+    parser.add_argument('--heuristic', help="heuristic for the informed searches")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc run that measures peak memory")
+    parser.add_argument('--output', help="write the report to this file (.json or .csv)")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON report to compare against; exits with 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=1.2, help="slowdown factor counted as a regression")
+    args = parser.parse_args(argv)
+
+    options = {'heuristic': args.heuristic} if args.heuristic else {}
+    algorithms = args.algorithms
+    if options:
+        # Only the informed searches take a heuristic
+        algorithms = [name for name in (algorithms or DEFAULT_ALGORITHMS)
+                      if name in ('hill_climbing', 'beam_search', 'a_star', 'bidirectional_a_star')]
+
+    report = run_benchmarks(args.families, args.sizes, algorithms, args.queries, args.seed,
+                            measure_memory=not args.no_memory, progress=_print_row, **options)
+    if args.output:
+        write_report(report, args.output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for family, size, algorithm, field, old_value, new_value in regressions:
+            print(f"REGRESSION {family} {size} {algorithm}: {field} {old_value:g} -> {new_value:g}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
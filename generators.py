@@ -0,0 +1,147 @@
+import math
+import random
+from array import array
+
+from graph import CSRGraph
+
+# Synthetic graphs for benchmarks and tests, built straight into CSRGraph arrays so
+# that sizes up to about 10^6 nodes fit in memory. Edges are undirected. Every
+# weight is at least the straight-line length of its edge, so the Euclidean
+# heuristic stays admissible without scaling. All generators are deterministic
+# for a given seed.
+
+def from_edges(xs, ys, sources, targets, weights):
+    # Builds a CSRGraph from parallel edge arrays, storing each edge in both directions
+    node_count = len(xs)
+    offsets = array('q', [0]) * (node_count + 1)
+    for node in sources:
+        offsets[node + 1] += 1
+    for node in targets:
+        offsets[node + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+
+    cursor = array('q', offsets)
+    arc_targets = array('i', [0]) * (2 * len(sources))
+    arc_weights = array('d', [0.0]) * (2 * len(sources))
+    min_weight_ratio = math.inf
+    for source, target, weight in zip(sources, targets, weights):
+        arc_targets[cursor[source]], arc_weights[cursor[source]] = target, weight
+        arc_targets[cursor[target]], arc_weights[cursor[target]] = source, weight
+        cursor[source] += 1
+        cursor[target] += 1
+        length = math.hypot(xs[source] - xs[target], ys[source] - ys[target])
+        if length > 0:
+            min_weight_ratio = min(min_weight_ratio, weight / length)
+
+    return CSRGraph(xs, ys, offsets, arc_targets, arc_weights, min_weight_ratio=min_weight_ratio)
+
+def grid(size, seed=0):
+    # 4-connected square grid of about size nodes with unit spacing and weights in [1, 2)
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(size))
+    xs, ys = array('d'), array('d')
+    sources, targets, weights = array('i'), array('i'), array('d')
+
+    for row in range(side):
+        for column in range(side):
+            node = row * side + column
+            xs.append(column)
+            ys.append(row)
+            if column + 1 < side:
+                sources.append(node)
+                targets.append(node + 1)
+                weights.append(1 + rng.random())
+            if row + 1 < side:
+                sources.append(node)
+                targets.append(node + side)
+                weights.append(1 + rng.random())
+
+    return from_edges(xs, ys, sources, targets, weights)
+
+def random_geometric(size, degree=8, seed=0):
+    # size points uniform in a square, joined when closer than the radius that gives
+    # the requested average degree. The square grows with size, so the density stays fixed.
+    rng = random.Random(seed)
+    side = math.sqrt(size)
+    radius = math.sqrt(degree / math.pi)
+    xs = array('d', (rng.random() * side for _ in range(size)))
+    ys = array('d', (rng.random() * side for _ in range(size)))
+    sources, targets, weights = array('i'), array('i'), array('d')
+
+    # Bucket the points into radius-sized cells so only neighbouring cells are compared
+    cells = {}
+    for node in range(size):
+        cells.setdefault((int(xs[node] // radius), int(ys[node] // radius)), []).append(node)
+
+    # Each pair of neighbouring cells is visited once: the cell itself, then four of its eight neighbours
+    for (cell_x, cell_y), members in cells.items():
+        for offset_x, offset_y in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            others = cells.get((cell_x + offset_x, cell_y + offset_y))
+            if others is None:
+                continue
+            same_cell = offset_x == 0 and offset_y == 0
+            for node in members:
+                node_x, node_y = xs[node], ys[node]
+                for other in others:
+                    if same_cell and other <= node:
+                        continue
+                    length = math.hypot(node_x - xs[other], node_y - ys[other])
+                    if length < radius:
+                        sources.append(node)
+                        targets.append(other)
+                        weights.append(length * (1 + 0.5 * rng.random()))
+
+    return from_edges(xs, ys, sources, targets, weights)
+
+def scale_free(size, edges_per_node=2, seed=0):
+    # Barabasi-Albert preferential attachment: each new node links to edges_per_node
+    # existing nodes picked with probability proportional to their degree. Positions
+    # are random, so the Euclidean heuristic is admissible but weak here.
+    rng = random.Random(seed)
+    side = math.sqrt(size)
+    xs = array('d', (rng.random() * side for _ in range(size)))
+    ys = array('d', (rng.random() * side for _ in range(size)))
+    sources, targets, weights = array('i'), array('i'), array('d')
+    endpoints = array('i')  # Every node appears once per incident edge
+
+    seed_nodes = min(size, edges_per_node + 1)
+    for node in range(1, seed_nodes):
+        for other in range(node):
+            sources.append(other)
+            targets.append(node)
+    endpoints.extend(sources)
+    endpoints.extend(targets)
+
+    for node in range(seed_nodes, size):
+        chosen = set()
+        while len(chosen) < edges_per_node:
+            chosen.add(endpoints[rng.randrange(len(endpoints))])
+        for other in chosen:
+            sources.append(other)
+            targets.append(node)
+            endpoints.append(other)
+            endpoints.append(node)
+
+    for source, target in zip(sources, targets):
+        length = math.hypot(xs[source] - xs[target], ys[source] - ys[target])
+        weights.append(max(length, 1.0) * (1 + rng.random()))
+
+    return from_edges(xs, ys, sources, targets, weights)
+
+def chain(size, seed=0):
+    # A single path 0 - 1 - ... - (size - 1): the worst case for search depth
+    rng = random.Random(seed)
+    xs = array('d', range(size))
+    ys = array('d', [0.0]) * size
+    sources = array('i', range(size - 1))
+    targets = array('i', range(1, size))
+    weights = array('d', (1 + rng.random() for _ in range(size - 1)))
+    return from_edges(xs, ys, sources, targets, weights)
+
+GENERATORS = {
+    'grid': grid,
+    'random_geometric': random_geometric,
+    'scale_free': scale_free,
+    'chain': chain,
+}
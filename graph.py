@@ -0,0 +1,369 @@
+import math
+from array import array
+
+def parse_weight(edge_label):
+    # Numeric edge labels are edge weights; any other label costs 1 like an unweighted edge
+    try:
+        weight = float(edge_label)
+    except (TypeError, ValueError):
+        return 1.0
+    if not weight >= 0:
+        raise ValueError(f"Edge weight must be a non-negative number, got {edge_label!r}")
+    return weight
+
+class Graph:
+    # Editable undirected graph on integer ids, like CSRGraph: nodes are numbered 0, 1, 2,
+    # ... in the order they are added, and connections (edges) are numbered the same way.
+    # Ids of deleted nodes and connections are not reused until the graph is cleared, so
+    # an id keeps naming the same node for traces, heuristic tables and the GUI.
+    #
+    # Everything lives in flat per-id columns instead of an object per node or edge:
+    # labels and xs/ys for nodes, edge_ends/edge_weights/edge_labels for connections.
+    # Each node's connections are one array('i') of (neighbor, connection) pairs, so
+    # adding a connection is O(1) and removing one or a node is O(degree).
+    def __init__(self):
+        self.labels = []  # Node label per id
+        self.xs = array('d')
+        self.ys = array('d')
+        self.incident = []  # Per node id: array('i') of neighbor, connection pairs; None once deleted
+        self.nodes_by_label = {}  # Node labels are unique
+        self.node_count = 0
+        self.edge_ends = array('i')  # node1, node2 per connection id
+        self.edge_weights = array('d')
+        self.edge_labels = []  # None once the connection is deleted
+        self.edge_count = 0
+        # edge label -> ordered set of connections. Weights are labels, so this would hold
+        # an entry for nearly every edge of a weighted graph; it is only built by the
+        # first find_connections() call and kept up to date from then on.
+        self._connections_by_label = None
+        # Smallest weight/length ratio of any edge added so far. Scaling the Euclidean
+        # distance by it keeps the A* heuristic admissible on weighted graphs. It is
+        # not raised again when edges are deleted, which only makes it looser.
+        self.min_weight_ratio = math.inf
+        self.version = 0  # Bumped on every change so caches built from the graph can tell they are stale
+
+    def __iter__(self):
+        return (node for node, pairs in enumerate(self.incident) if pairs is not None)
+
+    def __len__(self):
+        return self.node_count
+
+    def __contains__(self, node):
+        return isinstance(node, int) and 0 <= node < len(self.incident) and self.incident[node] is not None
+
+    def has_connection(self, connection):
+        return (isinstance(connection, int) and 0 <= connection < len(self.edge_labels)
+                and self.edge_labels[connection] is not None)
+
+    def add_node(self, label, x, y):
+        # Returns the new node's id
+        if label in self.nodes_by_label:
+            raise ValueError(f"A node labelled {label!r} already exists")
+        node = len(self.incident)
+        self.nodes_by_label[label] = node
+        self.labels.append(label)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.incident.append(array('i'))
+        self.node_count += 1
+        self.version += 1
+        return node
+
+    def remove_node(self, node):
+        # Only the incident connections are touched, so this is O(degree). The node's
+        # label and position stay readable, e.g. for erasing it from the screen.
+        if node not in self:
+            raise ValueError("Node is not in the graph")
+        for connection in self.connections_of(node):
+            self.remove_connection(connection)
+        self.incident[node] = None
+        del self.nodes_by_label[self.labels[node]]
+        self.node_count -= 1
+        self.version += 1
+
+    def add_connection(self, node1, node2, edge_label, weight=None):
+        # Returns the new connection's id. weight defaults to the one edge_label stands for.
+        weight = parse_weight(edge_label) if weight is None else float(weight)
+        if node1 not in self or node2 not in self:
+            raise ValueError("Both ends of a connection must be in the graph")
+        connection = len(self.edge_labels)
+        self.edge_ends.extend((node1, node2))
+        self.edge_weights.append(weight)
+        self.edge_labels.append(edge_label)
+        self.incident[node1].extend((node2, connection))
+        if node2 != node1:  # A self-loop is listed once
+            self.incident[node2].extend((node1, connection))
+        if self._connections_by_label is not None:
+            self._connections_by_label.setdefault(edge_label, {})[connection] = None
+        self.edge_count += 1
+        self.version += 1
+        self._update_weight_ratio(node1, node2, weight)
+        return connection
+
+    def remove_connection(self, connection):
+        if not self.has_connection(connection):
+            raise ValueError("Connection is not in the graph")
+        node1, node2 = self.endpoints(connection)
+        self._unlink(node1, connection)
+        if node2 != node1:
+            self._unlink(node2, connection)
+        self._unindex_label(connection)
+        self.edge_labels[connection] = None  # The ends stay readable, e.g. for replanning around them
+        self.edge_count -= 1
+        self.version += 1
+
+    def _unlink(self, node, connection):
+        pairs = self.incident[node]
+        position = 2 * pairs[1::2].index(connection)
+        del pairs[position:position + 2]
+
+    def _unindex_label(self, connection):
+        if self._connections_by_label is not None:
+            edge_label = self.edge_labels[connection]
+            same_label = self._connections_by_label[edge_label]
+            del same_label[connection]
+            if not same_label:
+                del self._connections_by_label[edge_label]
+
+    def _update_weight_ratio(self, node1, node2, weight):
+        length = math.hypot(self.xs[node1] - self.xs[node2], self.ys[node1] - self.ys[node2])
+        if length > 0:
+            self.min_weight_ratio = min(self.min_weight_ratio, weight / length)
+
+    def relabel_node(self, node, label):
+        self.relabel_nodes({self.labels[node]: label})
+
+    def relabel_connection(self, connection, edge_label):
+        self.relabel_connections({connection: edge_label})
+
+    # Bulk operations. Each call validates everything up front, so a bad entry leaves the graph untouched.
+
+    def add_nodes(self, nodes):
+        # nodes: (label, x, y) tuples. Returns the new ids in the same order.
+        nodes = list(nodes)
+        labels = [label for label, _, _ in nodes]
+        if len(set(labels)) != len(labels) or any(label in self.nodes_by_label for label in labels):
+            raise ValueError("Node labels must be unique")
+        return [self.add_node(label, x, y) for label, x, y in nodes]
+
+    def remove_nodes(self, nodes):
+        nodes = list(nodes)
+        if any(node not in self for node in nodes):
+            raise ValueError("Node is not in the graph")
+        for node in nodes:
+            if node in self:  # The same node may be listed twice
+                self.remove_node(node)
+
+    def add_connections(self, connections):
+        # connections: (node1, node2, edge_label) or (node1, node2, edge_label, weight)
+        # tuples. Returns the new ids in the same order.
+        connections = list(connections)
+        if any(connection[0] not in self or connection[1] not in self for connection in connections):
+            raise ValueError("Both ends of a connection must be in the graph")
+        for connection in connections:
+            if len(connection) < 4 or connection[3] is None:
+                parse_weight(connection[2])  # Raises for negative weights
+        return [self.add_connection(*connection) for connection in connections]
+
+    def remove_connections(self, connections):
+        connections = list(dict.fromkeys(connections))
+        if not all(self.has_connection(connection) for connection in connections):
+            raise ValueError("Connection is not in the graph")
+        for connection in connections:
+            self.remove_connection(connection)
+
+    def relabel_nodes(self, mapping):
+        # mapping: old label -> new label. Labels can be swapped within one call.
+        nodes = {old: self.nodes_by_label[old] for old in mapping if old in self.nodes_by_label}
+        if len(nodes) != len(mapping):
+            raise ValueError("Node is not in the graph")
+        new_labels = list(mapping.values())
+        kept_labels = self.nodes_by_label.keys() - mapping.keys()
+        if len(set(new_labels)) != len(new_labels) or any(label in kept_labels for label in new_labels):
+            raise ValueError("Node labels must be unique")
+
+        for old in mapping:
+            del self.nodes_by_label[old]
+        for old, node in nodes.items():
+            self.labels[node] = mapping[old]
+            self.nodes_by_label[mapping[old]] = node
+        self.version += 1
+
+    def relabel_connections(self, mapping):
+        # mapping: connection -> new edge label. Numeric labels are weights, so the
+        # connections' weights change with them.
+        if not all(self.has_connection(connection) for connection in mapping):
+            raise ValueError("Connection is not in the graph")
+        weights = {connection: parse_weight(edge_label) for connection, edge_label in mapping.items()}
+
+        for connection, edge_label in mapping.items():
+            self._unindex_label(connection)
+            self.edge_labels[connection] = edge_label
+            self.edge_weights[connection] = weights[connection]
+            if self._connections_by_label is not None:
+                self._connections_by_label.setdefault(edge_label, {})[connection] = None
+            self._update_weight_ratio(*self.endpoints(connection), weights[connection])
+        self.version += 1
+
+    def find_node(self, label):
+        return self.nodes_by_label.get(label)
+
+    def find_connections(self, edge_label):
+        if self._connections_by_label is None:
+            index = {}
+            for connection in self.connections():
+                index.setdefault(self.edge_labels[connection], {})[connection] = None
+            self._connections_by_label = index
+        return list(self._connections_by_label.get(edge_label, ()))
+
+    def connections(self):
+        # Ids of all connections, in the order they were added
+        return (connection for connection, edge_label in enumerate(self.edge_labels) if edge_label is not None)
+
+    def connections_of(self, node):
+        return self.incident[node][1::2].tolist()
+
+    def endpoints(self, connection):
+        return self.edge_ends[2 * connection], self.edge_ends[2 * connection + 1]
+
+    def edge_label(self, connection):
+        return self.edge_labels[connection]
+
+    def edge_weight(self, connection):
+        return self.edge_weights[connection]
+
+    def neighbors(self, node):
+        return self.incident[node][::2].tolist()
+
+    def edges(self, node):
+        # (neighbor, weight) pairs for every connection of the node
+        pairs = self.incident[node]
+        return zip(pairs[::2].tolist(), map(self.edge_weights.__getitem__, pairs[1::2]))
+
+    def weight(self, node, neighbor):
+        # Cheapest edge between two adjacent nodes (there can be parallel edges)
+        pairs, weights = self.incident[node], self.edge_weights
+        best = math.inf
+        for position in range(0, len(pairs), 2):
+            if pairs[position] == neighbor and weights[pairs[position + 1]] < best:
+                best = weights[pairs[position + 1]]
+        if best == math.inf:
+            raise ValueError(f"Nodes {node} and {neighbor} are not adjacent")
+        return best
+
+    @property
+    def heuristic_scale(self):
+        return self.min_weight_ratio if self.min_weight_ratio != math.inf else 1.0
+
+    def degree(self, node):
+        return len(self.incident[node]) // 2
+
+    def position(self, node):
+        return self.xs[node], self.ys[node]
+
+    def index(self, node):
+        return node
+
+    def label(self, node):
+        return self.labels[node]
+
+    def clear(self):
+        self.labels = []
+        self.xs = array('d')
+        self.ys = array('d')
+        self.incident = []
+        self.nodes_by_label = {}
+        self.node_count = 0
+        self.edge_ends = array('i')
+        self.edge_weights = array('d')
+        self.edge_labels = []
+        self.edge_count = 0
+        self._connections_by_label = None
+        self.min_weight_ratio = math.inf
+        self.version += 1
+
+class CSRGraph:
+    # Read-only graph in compressed sparse row form. Nodes are the integers 0..n-1;
+    # the arcs leaving node i are targets[offsets[i]:offsets[i + 1]] with the matching
+    # weights. Undirected edges are stored once in each direction. The arrays can be
+    # array.array objects or memoryviews over a memory-mapped file (see graph_io).
+    def __init__(self, xs, ys, offsets, targets, weights, labels=None, min_weight_ratio=math.inf, source=None):
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.labels = labels  # Sequence of node labels, or None to use the node ids
+        self.min_weight_ratio = min_weight_ratio
+        self.source = source  # (path, mmap, views) when the arrays are backed by a file
+        self.version = 0  # CSR graphs are read-only, so this never changes
+
+    def __iter__(self):
+        return iter(range(len(self.xs)))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __contains__(self, node):
+        return isinstance(node, int) and 0 <= node < len(self.xs)
+
+    def __reduce__(self):
+        # File-backed graphs are re-mapped from the file instead of being copied,
+        # so worker processes share the pages read-only through the OS cache.
+        if self.source is not None:
+            from graph_io import load_csr
+            return load_csr, (self.source[0],)
+        return CSRGraph, (self.xs, self.ys, self.offsets, self.targets, self.weights, self.labels, self.min_weight_ratio)
+
+    @property
+    def edge_count(self):
+        return len(self.targets) // 2
+
+    def neighbors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]].tolist()
+
+    def edges(self, node):
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:end].tolist(), self.weights[start:end].tolist())
+
+    def weight(self, node, neighbor):
+        # Cheapest arc from node to neighbor, found without slicing the arrays
+        targets, weights = self.targets, self.weights
+        best = math.inf
+        for arc in range(self.offsets[node], self.offsets[node + 1]):
+            if targets[arc] == neighbor and weights[arc] < best:
+                best = weights[arc]
+        if best == math.inf:
+            raise ValueError(f"Nodes {node} and {neighbor} are not adjacent")
+        return best
+
+    def degree(self, node):
+        return self.offsets[node + 1] - self.offsets[node]
+
+    @property
+    def heuristic_scale(self):
+        return self.min_weight_ratio if self.min_weight_ratio != math.inf else 1.0
+
+    def position(self, node):
+        return self.xs[node], self.ys[node]
+
+    def index(self, node):
+        return node
+
+    def label(self, node):
+        return str(node) if self.labels is None else self.labels[node]
+
+    def close(self):
+        if self.source is not None:
+            _, mapping, views = self.source
+            self.xs = self.ys = self.offsets = self.targets = self.weights = self.labels = None
+            self.source = None
+            for view in reversed(views):
+                view.release()  # The mmap cannot be closed while views on it exist
+            mapping.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,240 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from graph import Graph, CSRGraph
+
+# Two on-disk graph formats:
+#
+# Edge list (text, tab-separated, '#' starts a comment):
+#     node <label> <x> <y>
+#     edge <label1> <label2> <edge label>
+#
+# Binary CSR (little-endian), laid out so every array can be used in place from a
+# memory map without building per-node Python objects:
+#     header      magic, node count n, arc count m, label byte count (-1 if no labels),
+#                 smallest weight/length ratio
+#     xs, ys      float64[n]
+#     offsets     int64[n + 1]
+#     targets     int32[m], padded to a multiple of 8 bytes
+#     weights     float64[m]
+#     labels      int64[n + 1] offsets followed by the UTF-8 label bytes (if present)
+
+CSR_MAGIC = b'PSACSR01'
+CSR_HEADER = struct.Struct('<8sqqqd')
+
+class LabelTable:
+    # Node labels decoded on demand from an offsets array and a UTF-8 blob
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node):
+        return bytes(self.data[self.offsets[node]:self.offsets[node + 1]]).decode('utf-8')
+
+def save_edge_list(graph, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("# Path-search graph: node <label> <x> <y> / edge <label1> <label2> <edge label>\n")
+        for node in graph:
+            x, y = graph.position(node)
+            # repr() is the shortest text that reads back as exactly the same float
+            file.write(f"node\t{graph.label(node)}\t{x!r}\t{y!r}\n")
+
+        if isinstance(graph, CSRGraph):
+            for node in graph:
+                for neighbor, weight in graph.edges(node):
+                    if node < neighbor:  # Each undirected edge is stored as two arcs
+                        file.write(f"edge\t{graph.label(node)}\t{graph.label(neighbor)}\t{weight!r}\n")
+        else:
+            for connection in graph.connections():
+                node1, node2 = graph.endpoints(connection)
+                file.write(f"edge\t{graph.label(node1)}\t{graph.label(node2)}\t{graph.edge_label(connection)}\n")
+
+def load_edge_list(path):
+    graph = Graph()
+
+    with open(path, encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            fields = line.split('\t') if '\t' in line else line.split()
+
+            try:
+                if fields[0] == 'node' and len(fields) == 4:
+                    graph.add_node(fields[1], float(fields[2]), float(fields[3]))
+                elif fields[0] == 'edge' and len(fields) in (3, 4):
+                    edge_label = fields[3] if len(fields) == 4 else ''
+                    graph.add_connection(graph.nodes_by_label[fields[1]], graph.nodes_by_label[fields[2]], edge_label)
+                else:
+                    raise ValueError(f"unrecognised line {line!r}")
+            except KeyError as error:
+                raise ValueError(f"{path}:{line_number}: unknown node {error.args[0]!r}") from None
+            except ValueError as error:
+                raise ValueError(f"{path}:{line_number}: {error}") from None
+
+    return graph
+
+def to_csr(graph):
+    if isinstance(graph, CSRGraph):
+        return graph
+
+    ids = {node: index for index, node in enumerate(graph)}
+    xs, ys = array('d'), array('d')
+    offsets, targets, weights = array('q', [0]), array('i'), array('d')
+    labels = []
+
+    for node in graph:
+        x, y = graph.position(node)
+        xs.append(x)
+        ys.append(y)
+        labels.append(graph.label(node))
+        for neighbor, weight in graph.edges(node):
+            targets.append(ids[neighbor])
+            weights.append(weight)
+        offsets.append(len(targets))
+
+    return CSRGraph(xs, ys, offsets, targets, weights, labels, graph.min_weight_ratio)
+
+def csr_to_graph(csr):
+    # Build an editable Graph (e.g. for the GUI) from a CSR graph
+    graph = Graph()
+    graph.add_nodes((csr.label(node), csr.xs[node], csr.ys[node]) for node in csr)
+
+    # The labels only show the weight, which is passed on exactly. CSR ids and the new
+    # graph's ids are both 0..n-1 in the same order.
+    edge_labels = {}  # Weights that occur more than once share one label string
+    graph.add_connections((node, neighbor, edge_labels.setdefault(weight, f"{weight:g}"), weight)
+                          for node in csr for neighbor, weight in csr.edges(node) if node < neighbor)
+
+    return graph
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+def save_csr(graph, path):
+    csr = to_csr(graph)
+    node_count, arc_count = len(csr.xs), len(csr.targets)
+
+    if csr.labels is not None:
+        encoded = [csr.label(node).encode('utf-8') for node in csr]
+        label_offsets = array('q', [0])
+        for label in encoded:
+            label_offsets.append(label_offsets[-1] + len(label))
+        label_data = b''.join(encoded)
+    else:
+        label_data = None
+
+    def raw(values, typecode):
+        if not isinstance(values, array) or values.typecode != typecode or sys.byteorder != 'little':
+            values = array(typecode, values)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values.tobytes()
+
+    with open(path, 'wb') as file:
+        file.write(CSR_HEADER.pack(CSR_MAGIC, node_count, arc_count,
+                                   -1 if label_data is None else len(label_data), csr.min_weight_ratio))
+        file.write(_padding(CSR_HEADER.size))
+        file.write(raw(csr.xs, 'd'))
+        file.write(raw(csr.ys, 'd'))
+        file.write(raw(csr.offsets, 'q'))
+        targets = raw(csr.targets, 'i')
+        file.write(targets)
+        file.write(_padding(len(targets)))
+        file.write(raw(csr.weights, 'd'))
+        if label_data is not None:
+            file.write(raw(label_offsets, 'q'))
+            file.write(label_data)
+
+def _csr_size(node_count, arc_count, label_size):
+    # Length of a CSR file with the given header fields, as written by save_csr
+    size = CSR_HEADER.size + len(_padding(CSR_HEADER.size))
+    size += 8 * node_count * 2 + 8 * (node_count + 1)  # xs, ys, offsets
+    size += 4 * arc_count + len(_padding(4 * arc_count)) + 8 * arc_count  # targets, weights
+    if label_size >= 0:
+        size += 8 * (node_count + 1) + label_size
+    return size
+
+def load_csr(path):
+    with open(path, 'rb') as file:
+        try:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            raise ValueError(f"{path} is not a binary CSR graph file") from None
+
+    # A truncated or corrupt file must not get as far as casting the arrays
+    if len(mapping) < CSR_HEADER.size:
+        mapping.close()
+        raise ValueError(f"{path} is not a binary CSR graph file")
+    magic, node_count, arc_count, label_size, min_weight_ratio = CSR_HEADER.unpack_from(mapping)
+    if magic != CSR_MAGIC:
+        mapping.close()
+        raise ValueError(f"{path} is not a binary CSR graph file")
+    if node_count < 0 or arc_count < 0 or label_size < -1:
+        mapping.close()
+        raise ValueError(f"{path}: corrupt CSR header")
+    expected_size = _csr_size(node_count, arc_count, label_size)
+    if len(mapping) != expected_size:
+        size = len(mapping)
+        mapping.close()
+        raise ValueError(f"{path}: file is {size} bytes, but its header describes {expected_size} bytes "
+                         f"(truncated or corrupt)")
+
+    base = memoryview(mapping)
+    views = [base]
+    position = CSR_HEADER.size + len(_padding(CSR_HEADER.size))
+
+    def take(count, typecode, itemsize):
+        nonlocal position
+        size = count * itemsize
+        raw_view = base[position:position + size]
+        position += size + len(_padding(size))
+        if sys.byteorder == 'little':
+            view = raw_view.cast(typecode)
+            views.extend([raw_view, view])
+            return view
+        values = array(typecode)  # Big-endian hosts have to copy and swap
+        values.frombytes(raw_view)
+        values.byteswap()
+        raw_view.release()
+        return values
+
+    xs = take(node_count, 'd', 8)
+    ys = take(node_count, 'd', 8)
+    offsets = take(node_count + 1, 'q', 8)
+    targets = take(arc_count, 'i', 4)
+    weights = take(arc_count, 'd', 8)
+
+    labels = None
+    if label_size >= 0:
+        label_offsets = take(node_count + 1, 'q', 8)
+        label_data = base[position:position + label_size]
+        views.append(label_data)
+        labels = LabelTable(label_offsets, label_data)
+
+    # CSRGraph.close() releases the views in reverse order, derived views before the base one
+    graph = CSRGraph(xs, ys, offsets, targets, weights, labels, min_weight_ratio, source=(path, mapping, views))
+    if (offsets[0], offsets[node_count]) != (0, arc_count) or (
+            labels is not None and (label_offsets[0], label_offsets[node_count]) != (0, label_size)):
+        graph.close()
+        raise ValueError(f"{path}: corrupt CSR offsets")
+    return graph
+
+def is_csr_file(path):
+    with open(path, 'rb') as file:
+        return file.read(len(CSR_MAGIC)) == CSR_MAGIC
+
+def load_graph(path):
+    return load_csr(path) if is_csr_file(path) else load_edge_list(path)
+
+def save_graph(graph, path):
+    # Binary CSR for '.csr' files, the text edge list for anything else
+    if str(path).endswith('.csr'):
+        save_csr(graph, path)
+    else:
+        save_edge_list(graph, path)
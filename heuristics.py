@@ -0,0 +1,111 @@
+import math
+import weakref
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the tables are built with plain Python loops without it
+    np = None
+
+from landmarks import alt_table
+
+# Heuristic tables: the distance from every node to one goal, computed in a single
+# pass over the graph's coordinate arrays and cached per (graph, goal, heuristic).
+# Searches then look h(node) up as table[graph.index(node)].
+#
+# 'euclidean' and 'zero' are admissible on any graph once A* scales the Euclidean
+# table by graph.heuristic_scale. 'manhattan' and 'octile' are meant for 4- and
+# 8-connected grids, and 'haversine' (kilometres, with x = longitude and y =
+# latitude in degrees) for road graphs weighted in kilometres. 'alt' is built from
+# the graph's landmark distances (see landmarks.py) rather than its coordinates, is
+# in edge-weight units and is admissible on any undirected graph.
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_CACHED_GOALS = 8  # Tables kept per graph; each one is O(V) floats
+
+def _euclidean(xs, ys, goal_x, goal_y):
+    if np is not None:
+        return np.hypot(xs - goal_x, ys - goal_y)
+    return [math.hypot(x - goal_x, y - goal_y) for x, y in zip(xs, ys)]
+
+def _manhattan(xs, ys, goal_x, goal_y):
+    if np is not None:
+        return np.abs(xs - goal_x) + np.abs(ys - goal_y)
+    return [abs(x - goal_x) + abs(y - goal_y) for x, y in zip(xs, ys)]
+
+def _octile(xs, ys, goal_x, goal_y):
+    # Diagonal moves cost sqrt(2), straight moves cost 1
+    if np is not None:
+        dx, dy = np.abs(xs - goal_x), np.abs(ys - goal_y)
+        return np.maximum(dx, dy) + (math.sqrt(2) - 1) * np.minimum(dx, dy)
+    table = []
+    for x, y in zip(xs, ys):
+        dx, dy = abs(x - goal_x), abs(y - goal_y)
+        table.append(max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy))
+    return table
+
+def _haversine(xs, ys, goal_x, goal_y):
+    goal_lon, goal_lat = math.radians(goal_x), math.radians(goal_y)
+    if np is not None:
+        lons, lats = np.radians(xs), np.radians(ys)
+        a = np.sin((lats - goal_lat) / 2) ** 2 + np.cos(lats) * math.cos(goal_lat) * np.sin((lons - goal_lon) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    table = []
+    cos_goal_lat = math.cos(goal_lat)
+    for x, y in zip(xs, ys):
+        lon, lat = math.radians(x), math.radians(y)
+        a = math.sin((lat - goal_lat) / 2) ** 2 + math.cos(lat) * cos_goal_lat * math.sin((lon - goal_lon) / 2) ** 2
+        table.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return table
+
+def _zero(xs, ys, goal_x, goal_y):
+    return [0.0] * len(xs)
+
+HEURISTICS = {
+    'euclidean': _euclidean,
+    'manhattan': _manhattan,
+    'octile': _octile,
+    'haversine': _haversine,
+    'zero': _zero,
+}
+
+GRAPH_HEURISTICS = {
+    'alt': alt_table,
+}
+
+HEURISTIC_NAMES = [*HEURISTICS, *GRAPH_HEURISTICS]
+
+_tables = weakref.WeakKeyDictionary()  # graph -> OrderedDict((kind, goal index) -> (version, table))
+
+def heuristic_table(graph, goal, kind='euclidean'):
+    if kind not in HEURISTICS and kind not in GRAPH_HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {kind!r}")
+
+    tables = _tables.setdefault(graph, OrderedDict())
+    key = (kind, graph.index(goal))
+    cached = tables.get(key)
+    if cached is not None and cached[0] == graph.version:
+        tables.move_to_end(key)
+        return cached[1]
+
+    if kind in GRAPH_HEURISTICS:
+        table = GRAPH_HEURISTICS[kind](graph, goal)
+    else:
+        goal_x, goal_y = graph.position(goal)
+        xs, ys = graph.xs, graph.ys
+        if np is not None:
+            # Zero-copy views over the array('d') columns or the memory-mapped CSR file
+            xs, ys = np.frombuffer(xs, dtype=np.float64), np.frombuffer(ys, dtype=np.float64)
+        table = HEURISTICS[kind](xs, ys, goal_x, goal_y)
+
+    if np is not None and not isinstance(table, list):
+        table = table.tolist()  # Python floats index and add faster than NumPy scalars in the search loop
+
+    tables[key] = (graph.version, table)
+    if len(tables) > MAX_CACHED_GOALS:
+        tables.popitem(last=False)
+    return table
+
+def clear_heuristic_tables(graph):
+    # Forgets the cached tables of graph, e.g. so a benchmark times building them every query
+    _tables.pop(graph, None)
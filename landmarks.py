@@ -0,0 +1,118 @@
+import heapq
+import math
+import weakref
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, as in heuristics.py
+    np = None
+
+# ALT (A*, Landmarks, Triangle inequality) preprocessing. A few landmark nodes are
+# picked far apart from each other and the exact distance from each one to every
+# node is stored. For any landmark L, |d(L, goal) - d(L, v)| <= d(v, goal) on an
+# undirected graph, so the largest such difference is an admissible heuristic that
+# follows the real edge weights instead of straight-line distance.
+
+DEFAULT_LANDMARKS = 8
+
+class Landmarks:
+    def __init__(self, graph, nodes, distances):
+        self.nodes = nodes  # The landmark nodes
+        self.distances = distances  # One array per landmark, indexed by graph.index(node)
+        self.version = graph.version
+
+def shortest_distances(graph, source):
+    # Dijkstra from source; unreachable nodes keep an infinite distance
+    index = graph.index
+    distances = array('d', [math.inf]) * len(graph.xs)
+    distances[index(source)] = 0.0
+    priority_queue = [(0.0, 0, source)]
+    counter = 1
+
+    while priority_queue:
+        distance, _, node = heapq.heappop(priority_queue)
+        if distance > distances[index(node)]:
+            continue  # Stale entry
+        for neighbor, weight in graph.edges(node):
+            new_distance = distance + weight
+            if new_distance < distances[index(neighbor)]:
+                distances[index(neighbor)] = new_distance
+                heapq.heappush(priority_queue, (new_distance, counter, neighbor))
+                counter += 1
+
+    return distances
+
+def select_landmarks(graph, count=DEFAULT_LANDMARKS):
+    # Farthest-point selection: each new landmark is the node farthest (by path cost)
+    # from all the landmarks picked so far. An unreachable node starts a new
+    # component, so every component gets landmarks of its own.
+    nodes = list(graph)
+    if not nodes:
+        return Landmarks(graph, [], [])
+
+    by_index = {graph.index(node): node for node in nodes}
+    landmark_nodes, distances = [], []
+    closest = array('d', [math.inf]) * len(graph.xs)  # Distance to the nearest landmark so far
+    candidate = nodes[0]
+
+    while len(landmark_nodes) < min(count, len(nodes)):
+        landmark_distances = shortest_distances(graph, candidate)
+        if not landmark_nodes:
+            # The first pick is arbitrary, so start again from the node farthest from it
+            candidate = _farthest(landmark_distances, by_index) or candidate
+            landmark_distances = shortest_distances(graph, candidate)
+
+        landmark_nodes.append(candidate)
+        distances.append(landmark_distances)
+        for node_index in by_index:
+            closest[node_index] = min(closest[node_index], landmark_distances[node_index])
+
+        candidate = _farthest(closest, by_index)
+        if candidate is None:
+            break  # Every node is a landmark already
+
+    return Landmarks(graph, landmark_nodes, distances)
+
+def _farthest(distances, by_index):
+    # Unreachable (infinite) nodes come first, then the largest finite distance
+    best, best_distance = None, 0.0
+    for node_index, node in by_index.items():
+        if distances[node_index] > best_distance:
+            best, best_distance = node, distances[node_index]
+    return best
+
+_landmarks = weakref.WeakKeyDictionary()  # graph -> Landmarks
+
+def preprocess(graph, count=DEFAULT_LANDMARKS):
+    landmarks = select_landmarks(graph, count)
+    _landmarks[graph] = landmarks
+    return landmarks
+
+def get_landmarks(graph):
+    # The graph's landmarks, recomputed if the graph changed since they were picked
+    landmarks = _landmarks.get(graph)
+    if landmarks is None or landmarks.version != graph.version:
+        landmarks = preprocess(graph, len(landmarks.nodes) if landmarks and landmarks.nodes else DEFAULT_LANDMARKS)
+    return landmarks
+
+def alt_table(graph, goal):
+    landmarks = get_landmarks(graph)
+    goal_index = graph.index(goal)
+
+    if np is not None:
+        table = np.zeros(len(graph.xs))
+        for distances in landmarks.distances:
+            column = np.frombuffer(distances, dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                difference = np.abs(column[goal_index] - column)
+            table = np.fmax(table, np.nan_to_num(difference, nan=0.0, posinf=math.inf))
+        return table.tolist()
+
+    table = [0.0] * len(graph.xs)
+    for distances in landmarks.distances:
+        goal_distance = distances[goal_index]
+        for node_index, distance in enumerate(distances):
+            if distance != goal_distance:  # Also skips inf - inf when both are unreachable
+                table[node_index] = max(table[node_index], abs(goal_distance - distance))
+    return table
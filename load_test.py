@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from query_server import DEFAULT_PORT, QueryClient
+
+# Load test for query_server.py: keeps a fixed number of requests in flight over a few
+# connections, then reports latency percentiles and throughput. Latency is measured per
+# request, from sending it to receiving its response, so it includes time spent
+# queued behind other requests on the server.
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted, non-empty list
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+async def run_load_test(jobs, host='127.0.0.1', port=DEFAULT_PORT, connections=4, concurrency=16, batch_size=1,
+                        graph=None):
+    # jobs: (start, goal, algorithm, options) tuples, each sent once. concurrency is the
+    # number of requests in flight per connection; with batch_size > 1 every request
+    # is a batch of that many jobs.
+    requests = [jobs[index:index + batch_size] for index in range(0, len(jobs), batch_size)]
+    clients = [await QueryClient.connect(host, port) for _ in range(connections)]
+    latencies = []
+    failures = []
+    found = 0
+    next_request = iter(requests)
+
+    async def worker(client):
+        nonlocal found
+        for request in next_request:  # The iterator is shared, so every request is sent once
+            started = time.perf_counter()
+            try:
+                if batch_size == 1:
+                    results = [await client.search(*request[0][:3], graph=graph, **request[0][3])]
+                else:
+                    results = await client.batch(request, graph=graph)
+            except (ConnectionError, ValueError) as error:
+                failures.append(str(error))
+                continue
+            latencies.append(time.perf_counter() - started)
+            for result in results:
+                if result['error'] is not None:
+                    failures.append(result['error'])
+                elif result['path'] is not None:
+                    found += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(client) for client in clients for _ in range(concurrency)))
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(requests),
+        'queries': len(jobs),
+        'found': found,
+        'errors': len(failures),
+        'first_error': failures[0] if failures else None,
+        'connections': connections,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0,
+        'queries_per_second': len(jobs) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 0.50) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None,
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else None,
+        'max_ms': latencies[-1] * 1000 if latencies else None,
+    }
+
+def random_jobs(graph, count, algorithm='a_star', seed=0, **options):
+    # count random start/goal pairs by label, for a graph file the server also has loaded
+    rng = random.Random(seed)
+    nodes = list(graph)
+    return [(graph.label(rng.choice(nodes)), graph.label(rng.choice(nodes)), algorithm, options)
+            for _ in range(count)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running query_server.py.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--jobs', help="jobs file in batch.py format: '<start> <goal> <algorithm> [option]' per line")
+    source.add_argument('--graph-file', help="graph file to draw random start/goal labels from")
+    parser.add_argument('--graph', help="name of the graph on the server (default: its only graph)")
+    parser.add_argument('--count', type=int, default=1000, help="random queries to send with --graph-file")
+    parser.add_argument('--algorithm', default='a_star', help="algorithm for the random queries")
+    parser.add_argument('--heuristic', help="heuristic for the random queries")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the random queries")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--connections', type=int, default=4, help="TCP connections to open")
+    parser.add_argument('--concurrency', type=int, default=16, help="requests in flight per connection")
+    parser.add_argument('--batch-size', type=int, default=1, help="queries per request (1 sends single searches)")
+    parser.add_argument('--output', help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        from batch import read_jobs
+        with open(args.jobs, encoding='utf-8') as file:
+            jobs = list(read_jobs(file))
+    else:
+        from graph_io import load_graph
+        options = {'heuristic': args.heuristic} if args.heuristic else {}
+        jobs = random_jobs(load_graph(args.graph_file), args.count, args.algorithm, args.seed, **options)
+
+    report = asyncio.run(run_load_test(jobs, args.host, args.port, args.connections, args.concurrency,
+                                       args.batch_size, args.graph))
+    print(f"{report['requests']} requests ({report['queries']} queries, {report['found']} paths found, "
+          f"{report['errors']} errors) in {report['seconds']:.2f} s")
+    if report['p50_ms'] is not None:
+        print(f"throughput {report['requests_per_second']:.0f} requests/s, {report['queries_per_second']:.0f} queries/s")
+        print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+    if report['first_error']:
+        print(f"first error: {report['first_error']}", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from batch import BatchResult
+from search_engine import ResultCache, search
+
+# Query service: an asyncio server that keeps one or more graphs loaded and answers
+# search requests from other programs. The protocol is JSON lines over TCP: every
+# request is one JSON object on its own line, and every response is one line with
+# the same "id". A connection may send many requests without waiting; responses come
+# back as they finish, which is not necessarily in request order.
+#
+#     {"id": 1, "op": "search", "graph": "roads", "start": "A", "goal": "E",
+#      "algorithm": "a_star", "options": {"heuristic": "alt"}}
+#     -> {"id": 1, "result": {"path": [...], "path_cost": 7.0, ..., "error": null}}
+#     {"id": 2, "op": "batch", "graph": "roads", "queries": [{"start": ..., ...}, ...]}
+#     -> {"id": 2, "results": [...]}  (in query order)
+#     {"id": 3, "op": "graphs"}  -> {"id": 3, "graphs": {"roads": {"nodes": ..., "edges": ...}}}
+#
+# Results have the fields of batch.py's JSON output; a query that cannot run (unknown
+# label, algorithm or option) has "error" set. A malformed request gets {"id", "error"}.
+#
+# The searches are CPU-bound, so they run on a process pool whose workers each get the
+# graphs once, through the pool initializer, like batch mode. Single searches that
+# arrive close together for the same graph are batched into one pool task, which
+# saves a round trip to a worker per query. Back-pressure: at most max_pending
+# queries are in flight at once, counting each query of a batch; past that the server
+# stops reading from the connections until some finish, so fast clients are slowed
+# down by TCP instead of piling requests up in memory. A connection only holds slots
+# while it has requests running, not while it sits idle.
+
+DEFAULT_PORT = 8765
+STREAM_LIMIT = 16 * 1024 * 1024  # Longest request or response line, e.g. a large batch
+
+_graphs = None  # Worker state: graph name -> (graph, nodes by label, ResultCache of response dicts)
+
+def _init_worker(graphs):
+    global _graphs
+    _graphs = {name: (graph, {graph.label(node): node for node in graph}, ResultCache())
+               for name, graph in graphs.items()}
+
+def _run_queries(name, jobs):
+    # Runs (start_label, goal_label, algorithm, options) jobs against one graph in a worker
+    graph, nodes_by_label, cache = _graphs[name]
+    results = []
+    for job in jobs:
+        start_label, goal_label, algorithm, options = job
+        try:
+            start = nodes_by_label.get(start_label)
+            goal = nodes_by_label.get(goal_label)
+            if start is None or goal is None:
+                raise ValueError(f"Unknown node label in job {job!r}")
+            # Only the JSON-ready dict is cached, not the SearchResult with its visited set
+            result = cache.get(graph, start, goal, algorithm, **options)
+            if result is None:
+                result = BatchResult(job, search(graph, start, goal, algorithm, **options), graph=graph).as_dict()
+                cache.put(graph, start, goal, algorithm, result, **options)
+            results.append(result)
+        except (ValueError, TypeError) as error:
+            # Requests come from other programs, so unhashable labels and unknown options
+            # (TypeError) are reported like any other bad query
+            results.append(BatchResult(job, error=str(error)).as_dict())
+    return results
+
+def _parse_query(query):
+    # Raises ValueError for queries that are not even well-formed
+    if not isinstance(query, dict):
+        raise ValueError("A query must be a JSON object")
+    try:
+        start, goal = query['start'], query['goal']
+    except KeyError as error:
+        raise ValueError(f"Missing query field {error.args[0]!r}") from None
+    options = query.get('options') or {}
+    if not isinstance(options, dict):
+        raise ValueError("Query options must be a JSON object")
+    return (start, goal, query.get('algorithm', 'a_star'), options)
+
+def _decode_request(line):
+    request = json.loads(line)  # Malformed JSON raises a ValueError too
+    if not isinstance(request, dict):
+        raise ValueError("A request must be a JSON object")
+    return request
+
+class _QuerySlots:
+    # Counting semaphore that takes several slots at once, e.g. one per query of a
+    # batch. Waiters are served in arrival order, all their slots together, so a big
+    # batch is neither starved by single searches nor left holding part of its slots.
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.waiters = collections.deque()  # (count, future)
+
+    async def acquire(self, count):
+        if not self.waiters and self.used + count <= self.limit:
+            self.used += count
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((count, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(count)  # Granted just as the wait was cancelled
+            else:
+                if (count, future) in self.waiters:
+                    self.waiters.remove((count, future))
+                self._wake()  # The waiters behind it may fit now
+            raise
+
+    def release(self, count):
+        self.used -= count
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self.used + self.waiters[0][0] <= self.limit:
+            count, future = self.waiters.popleft()
+            if not future.done():  # Skips waits cancelled before they were removed
+                self.used += count
+                future.set_result(None)
+
+class QueryServer:
+    def __init__(self, graphs, workers=None, max_pending=256, max_batch=64, batch_delay=0.002):
+        # graphs: name -> Graph or CSRGraph. workers=0 runs the searches on one thread
+        # in this process instead of a process pool, e.g. for debugging.
+        self.graphs = graphs
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending  # Most queries in flight; also the largest batch accepted
+        self.max_batch = max_batch  # Most single searches sent to a worker as one task
+        self.batch_delay = batch_delay  # Seconds a single search waits for others to batch with
+        self.executor = None
+        self.server = None
+        self.slots = None  # _QuerySlots counting queries in flight
+        self.pending = {}  # graph name -> [(job, future)] waiting to be sent to a worker
+        self.flush_handles = {}  # graph name -> scheduled flush of pending
+        self.connections = {}  # StreamWriter -> its handler task
+        self.requests = 0
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        if self.workers == 0:
+            _init_worker(self.graphs)
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                initargs=(self.graphs,))
+        self.slots = _QuerySlots(self.max_pending)
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=STREAM_LIMIT)
+        return self.server
+
+    @property
+    def address(self):
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Dropping the connections makes their handlers finish their requests and return
+            for writer in list(self.connections):
+                writer.transport.abort()
+            if self.connections:
+                await asyncio.wait(list(self.connections.values()))
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while not writer.is_closing():  # Stop reading once the client has gone
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    line = b''
+                if not line.strip():
+                    if not line:
+                        break
+                    continue
+                try:
+                    request = _decode_request(line)
+                except ValueError as error:
+                    request = error  # Answered with the error by handle_line
+                # Back-pressure: the next line is not read until the server has room for this one
+                slots = self.request_slots(request)
+                await self.slots.acquire(slots)
+                task = asyncio.create_task(self.handle_line(request, slots, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            del self.connections[writer]
+
+    def request_slots(self, request):
+        # One slot per query. Batches too big to ever fit are rejected by handle_request.
+        if isinstance(request, dict) and request.get('op') == 'batch':
+            queries = request.get('queries')
+            if isinstance(queries, list) and 0 < len(queries) <= self.max_pending:
+                return len(queries)
+        return 1
+
+    async def handle_line(self, request, slots, writer, write_lock):
+        # request: the decoded request, or the ValueError that decoding it raised
+        request_id = None
+        try:
+            if isinstance(request, ValueError):
+                raise request
+            request_id = request.get('id')
+            response = await self.handle_request(request)
+        except ValueError as error:  # Includes malformed JSON
+            response = {'error': str(error)}
+        except Exception as error:  # E.g. a broken worker pool; the connection stays usable
+            response = {'error': f"{type(error).__name__}: {error}"}
+        finally:
+            self.slots.release(slots)
+        response['id'] = request_id
+        self.requests += 1
+
+        async with write_lock:  # Responses from concurrent requests must not interleave
+            try:
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()  # A client that stops reading only holds up its own requests
+            except ConnectionError:
+                writer.close()  # Its other queued requests are not run
+
+    async def handle_request(self, request):
+        op = request.get('op', 'search')
+        if op == 'graphs':
+            return {'graphs': {name: {'nodes': len(graph), 'edges': graph.edge_count}
+                               for name, graph in self.graphs.items()}}
+
+        name = request.get('graph')
+        if name is None and len(self.graphs) == 1:
+            name = next(iter(self.graphs))  # The graph can be left out when only one is loaded
+        if name not in self.graphs:
+            raise ValueError(f"Unknown graph: {name!r}")
+
+        if op == 'search':
+            return {'result': await self.search(name, _parse_query(request))}
+        if op == 'batch':
+            queries = request.get('queries')
+            if not isinstance(queries, list):
+                raise ValueError("A batch needs a list of queries")
+            if len(queries) > self.max_pending:
+                raise ValueError(f"A batch can hold at most {self.max_pending} queries; split it up")
+            return {'results': await self.search_many(name, [_parse_query(query) for query in queries])}
+        raise ValueError(f"Unknown op: {op!r}")
+
+    def search(self, name, job):
+        # Queues a single search to be sent to a worker with others for the same graph
+        future = asyncio.get_running_loop().create_future()
+        pending = self.pending.setdefault(name, [])
+        pending.append((job, future))
+        if len(pending) >= self.max_batch:
+            self.flush(name)
+        elif name not in self.flush_handles:
+            self.flush_handles[name] = asyncio.get_running_loop().call_later(self.batch_delay, self.flush, name)
+        return future
+
+    def flush(self, name):
+        handle = self.flush_handles.pop(name, None)
+        if handle is not None:
+            handle.cancel()
+        batch = self.pending.pop(name, [])
+        for chunk in self.chunks(batch):
+            task = asyncio.get_running_loop().run_in_executor(self.executor, _run_queries, name,
+                                                              [job for job, _ in chunk])
+            task.add_done_callback(lambda task, chunk=chunk: _deliver(task, chunk))
+
+    def chunks(self, jobs):
+        # Splits jobs into pool tasks: no more than max_batch each, and spread over all
+        # the workers rather than handing everything to one of them
+        size = min(self.max_batch, max(1, -(-len(jobs) // max(1, self.workers))))
+        return [jobs[index:index + size] for index in range(0, len(jobs), size)]
+
+    async def search_many(self, name, jobs):
+        # A client's batch is already grouped, so it goes straight to the workers
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, _run_queries, name, chunk)
+                                         for chunk in self.chunks(jobs)))
+        return [result for chunk in results for result in chunk]
+
+def _deliver(task, batch):
+    # Hands the results of one pool task to the requests waiting on them
+    error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+    for index, (_, future) in enumerate(batch):
+        if future.done():
+            continue  # The request was abandoned
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(task.result()[index])
+
+class QueryClient:
+    # Asyncio client for the query service. Requests are pipelined: any number of
+    # coroutines can share one client, and each gets its own response back.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}  # request id -> future for its response
+        self.next_id = 0
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=STREAM_LIMIT)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        error = ConnectionError("Connection closed by the server")
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ConnectionError, ValueError) as exc:
+            error = exc
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(error)
+        self.waiting.clear()
+
+    async def request(self, request):
+        # Sends one request object and returns the whole response object
+        self.next_id += 1
+        request = dict(request, id=self.next_id)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        await self.writer.drain()  # Waits here when the server applies back-pressure
+        response = await future
+        if response.get('error') is not None:
+            raise ValueError(response['error'])
+        return response
+
+    async def search(self, start, goal, algorithm='a_star', graph=None, **options):
+        response = await self.request({'op': 'search', 'graph': graph, 'start': start, 'goal': goal,
+                                       'algorithm': algorithm, 'options': options})
+        return response['result']
+
+    async def batch(self, jobs, graph=None):
+        # jobs: (start, goal, algorithm[, options]) tuples; results come back in job order
+        queries = [{'start': job[0], 'goal': job[1], 'algorithm': job[2], 'options': job[3] if len(job) > 3 else {}}
+                   for job in jobs]
+        response = await self.request({'op': 'batch', 'graph': graph, 'queries': queries})
+        return response['results']
+
+    async def graphs(self):
+        return (await self.request({'op': 'graphs'}))['graphs']
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self.receiver
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve search queries over JSON lines on TCP.")
+    parser.add_argument('graphs', nargs='+', metavar='[NAME=]PATH',
+                        help="graph files to load (edge list or binary CSR); NAME defaults to the file name")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: CPU count; 0 runs searches on a thread)")
+    parser.add_argument('--max-pending', type=int, default=256,
+                        help="queries in flight before reads pause, and the largest batch accepted")
+    parser.add_argument('--max-batch', type=int, default=64, help="most searches sent to a worker at a time")
+    parser.add_argument('--batch-delay', type=float, default=2.0, help="milliseconds a search waits to be batched")
+    args = parser.parse_args(argv)
+
+    from graph_io import load_graph
+    graphs = {}
+    for spec in args.graphs:
+        name, _, path = spec.rpartition('=')
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        graphs[name] = load_graph(path)
+
+    async def serve():
+        server = QueryServer(graphs, workers=args.workers, max_pending=args.max_pending,
+                             max_batch=args.max_batch, batch_delay=args.batch_delay / 1000)
+        await server.start(args.host, args.port)
+        host, port = server.address
+        print(f"Serving {', '.join(graphs)} on {host}:{port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,60 @@
 import tkinter as tk
-from tkinter import simpledialog
-from queue import Queue
-import heapq
-import math
+from tkinter import simpledialog, filedialog
 import tkinter.messagebox
-
-class Node:
-    def __init__(self, label, x, y, color='lightblue'):
-        self.label = label
-        self.x = x
-        self.y = y
-        self.color = color
-
-class Connection:
-    def __init__(self, node1, node2, edge_label):
-        self.node1 = node1
-        self.node2 = node2
-        self.edge_label = edge_label
+import graph_io
+from graph import Graph, CSRGraph
+from heuristics import HEURISTIC_NAMES
+from animation import SearchAnimation
+from search_engine import EXPAND, PUSH, PRUNE, IncrementalAStar, ResultCache, SearchResult, iter_search, path_cost
+from search_trace import TracePlayer, TraceWriter, load_trace
+from spatial import GridIndex, SegmentIndex
+
+NODE_RADIUS = 20
+MIN_FONT_SIZE = 6  # Smaller labels are not drawn
+MIN_ZOOM, MAX_ZOOM = 0.01, 10.0
+MAX_LABELED_NODES = 30  # Expanded nodes listed in the Path Elements label while a search runs
+
+GRAPH_FILE_TYPES = [("Edge list", "*.txt"), ("Binary CSR", "*.csr"), ("All files", "*")]
+TRACE_FILE_TYPES = [("Binary trace", "*.trace"), ("JSON lines", "*.jsonl"), ("All files", "*")]
 
 class GraphEditor:
     def __init__(self, master):
         self.master = master
         self.master.title("Path-Search Algorithms Visualizer")
 
-        self.graph = []
-        self.connections = []
+        self.graph = Graph()
+        self.node_colors = {}  # View state kept out of the model: node id -> fill color
+
+        # Canvas items are created once per node/edge and updated in place
+        self.node_items = {}  # node id -> (oval id, text id)
+        self.edge_items = {}  # connection id -> (line id, text id)
+        self.dirty_nodes = set()  # Ids of nodes whose fill needs refreshing
+        self.redraw_pending = None
+
+        # Nodes are indexed by position for hit-testing and for only drawing what is in view.
+        # The view can be panned and zoomed: screen = (world - offset) * zoom.
+        self.spatial_index = GridIndex(cell_size=2 * NODE_RADIUS)
+        self.edge_index = SegmentIndex(cell_size=8 * NODE_RADIUS)  # Connections, so edges crossing the view are drawn
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.viewport_dirty = False
+        self.pan_position = (0, 0)
 
         self.canvas = tk.Canvas(self.master, width=400, height=400, bg='white')
         self.canvas.pack(expand=tk.YES, fill=tk.BOTH)
 
         self.canvas.bind("<Button-1>", self.handle_click)
 
+        # Drag with the right (or middle) button to pan, use the mouse wheel to zoom
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.start_pan)
+            self.canvas.bind(f"<B{button}-Motion>", self.pan)
+        self.canvas.bind("<MouseWheel>", self.zoom_view)
+        self.canvas.bind("<Button-4>", self.zoom_view)
+        self.canvas.bind("<Button-5>", self.zoom_view)
+        self.canvas.bind("<Configure>", lambda event: self.draw_graph())
+
         self.selected_node = None
         self.start_node = None
         self.goal_node = None
@@ -38,12 +62,18 @@ class GraphEditor:
         self.enqueue_label = tk.Label(self.master, text="Enqueues: 0")
         self.enqueue_label.pack(side=tk.TOP)
 
-        self.extensions_label = tk.Label(self.master, text="Extensions/Paths: 0")
+        self.extensions_label = tk.Label(self.master, text="Extensions: 0")
         self.extensions_label.pack(side=tk.TOP)
 
+        self.pruned_label = tk.Label(self.master, text="Pruned: 0, Duplicates: 0")
+        self.pruned_label.pack(side=tk.TOP)
+
         self.queue_size_label = tk.Label(self.master, text="Queue Size: 0")
         self.queue_size_label.pack(side=tk.TOP)
 
+        self.visited_label = tk.Label(self.master, text="Visited: None")
+        self.visited_label.pack(side=tk.TOP)
+
         self.path_elements_label = tk.Label(self.master, text="Path Elements: None")
         self.path_elements_label.pack(side=tk.TOP)
 
@@ -62,6 +92,22 @@ class GraphEditor:
         self.dfs_button = tk.Button(self.master, text="Run DFS", command=self.run_dfs)
         self.dfs_button.pack(side=tk.TOP)
 
+        # Add buttons for the depth-bounded variants of DFS
+        self.depth_limited_dfs_button = tk.Button(self.master, text="Run Depth-Limited DFS", command=self.run_depth_limited_dfs)
+        self.depth_limited_dfs_button.pack(side=tk.TOP)
+
+        self.iterative_deepening_dfs_button = tk.Button(self.master, text="Run Iterative Deepening DFS",
+                                                        command=self.run_iterative_deepening_dfs)
+        self.iterative_deepening_dfs_button.pack(side=tk.TOP)
+
+        # Add a control for the depth limit used by Depth-Limited DFS
+        self.depth_limit_frame = tk.Frame(self.master)
+        self.depth_limit_frame.pack(side=tk.TOP)
+        tk.Label(self.depth_limit_frame, text="Depth Limit:").pack(side=tk.LEFT)
+        self.depth_limit_var = tk.IntVar(value=10)
+        self.depth_limit_spinbox = tk.Spinbox(self.depth_limit_frame, from_=0, to=100000, width=7, textvariable=self.depth_limit_var)
+        self.depth_limit_spinbox.pack(side=tk.LEFT)
+
         # Add a button for running Hill Climbing
         self.hill_climbing_button = tk.Button(self.master, text="Run Hill Climbing", command=self.run_hill_climbing)
         self.hill_climbing_button.pack(side=tk.TOP)
@@ -70,6 +116,22 @@ class GraphEditor:
         self.beam_search_button = tk.Button(self.master, text="Run Beam Search", command=self.run_beam_search)
         self.beam_search_button.pack(side=tk.TOP)
 
+        # Add a control for the beam width used by Beam Search
+        self.beam_width_frame = tk.Frame(self.master)
+        self.beam_width_frame.pack(side=tk.TOP)
+        tk.Label(self.beam_width_frame, text="Beam Width:").pack(side=tk.LEFT)
+        self.beam_width_var = tk.IntVar(value=2)
+        self.beam_width_spinbox = tk.Spinbox(self.beam_width_frame, from_=1, to=1000, width=5, textvariable=self.beam_width_var)
+        self.beam_width_spinbox.pack(side=tk.LEFT)
+
+        # Add a control for the heuristic used by Hill Climbing, Beam Search and A*
+        self.heuristic_frame = tk.Frame(self.master)
+        self.heuristic_frame.pack(side=tk.TOP)
+        tk.Label(self.heuristic_frame, text="Heuristic:").pack(side=tk.LEFT)
+        self.heuristic_var = tk.StringVar(value='euclidean')
+        self.heuristic_menu = tk.OptionMenu(self.heuristic_frame, self.heuristic_var, *HEURISTIC_NAMES)
+        self.heuristic_menu.pack(side=tk.LEFT)
+
         # Add a button for running Branch and Bound
         self.branch_and_bound_button = tk.Button(self.master, text="Run Branch and Bound", command=self.run_branch_and_bound)
         self.branch_and_bound_button.pack(side=tk.TOP)
@@ -78,6 +140,53 @@ class GraphEditor:
         self.a_star_button = tk.Button(self.master, text="Run A*", command=self.run_a_star)
         self.a_star_button.pack(side=tk.TOP)
 
+        # Add buttons for the bidirectional variants of BFS and A*
+        self.bidirectional_bfs_button = tk.Button(self.master, text="Run Bidirectional BFS", command=self.run_bidirectional_bfs)
+        self.bidirectional_bfs_button.pack(side=tk.TOP)
+
+        self.bidirectional_a_star_button = tk.Button(self.master, text="Run Bidirectional A*", command=self.run_bidirectional_a_star)
+        self.bidirectional_a_star_button.pack(side=tk.TOP)
+
+        # Add a button for incremental A*: once it has run, every edit repairs its path right away
+        self.planner = None
+        self.incremental_a_star_button = tk.Button(self.master, text="Run Incremental A* (LPA*)", command=self.run_incremental_a_star)
+        self.incremental_a_star_button.pack(side=tk.TOP)
+
+        # Add controls for the running search animation
+        self.animation = None
+        self.result_cache = ResultCache()  # Finished searches, dropped whenever the graph changes
+        self.speed_scale = tk.Scale(self.master, label="Step Delay (ms, 0 = no delay)", from_=0, to=2000, resolution=10,
+                                    orient=tk.HORIZONTAL, length=250, command=self.set_animation_delay)
+        self.speed_scale.set(1000)
+        self.speed_scale.pack(side=tk.TOP)
+
+        self.animation_frame = tk.Frame(self.master)
+        self.animation_frame.pack(side=tk.TOP)
+        self.pause_button = tk.Button(self.animation_frame, text="Pause", command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT)
+        self.step_button = tk.Button(self.animation_frame, text="Step", command=self.step_search)
+        self.step_button.pack(side=tk.LEFT)
+        self.jump_button = tk.Button(self.animation_frame, text="Jump to Result", command=self.finish_search)
+        self.jump_button.pack(side=tk.LEFT)
+        self.cancel_button = tk.Button(self.animation_frame, text="Cancel", command=self.cancel_search)
+        self.cancel_button.pack(side=tk.LEFT)
+
+        # Add controls for recording searches to trace files and replaying them. While a
+        # trace is loaded, the slider scrubs through its events and Pause/Step/Jump to
+        # Result drive the replay instead of a live search.
+        self.trace_player = None
+        self.trace_nodes = {}  # node index -> node, for the replayed trace
+        self.trace_frame = tk.Frame(self.master)
+        self.trace_frame.pack(side=tk.TOP)
+        self.record_trace_var = tk.BooleanVar(value=False)
+        self.record_trace_check = tk.Checkbutton(self.trace_frame, text="Record Trace", variable=self.record_trace_var)
+        self.record_trace_check.pack(side=tk.LEFT)
+        self.load_trace_button = tk.Button(self.trace_frame, text="Load Trace", command=self.load_trace)
+        self.load_trace_button.pack(side=tk.LEFT)
+        self.trace_scale = tk.Scale(self.master, label="Trace Position", from_=0, to=0, orient=tk.HORIZONTAL,
+                                    length=250, command=self.seek_trace)
+        self.trace_scale.pack(side=tk.TOP)
+
         # Add a button for deleting nodes
         self.delete_button = tk.Button(self.master, text="Delete Node", command=self.delete_node)
         self.delete_button.pack(side=tk.TOP)
@@ -90,448 +199,673 @@ class GraphEditor:
         self.clear_button = tk.Button(self.master, text="Clear Graph", command=self.clear_graph)
         self.clear_button.pack(side=tk.TOP)
 
+        # Add buttons for saving and loading graph files
+        self.save_button = tk.Button(self.master, text="Save Graph", command=self.save_graph)
+        self.save_button.pack(side=tk.TOP)
+
+        self.load_button = tk.Button(self.master, text="Load Graph", command=self.load_graph)
+        self.load_button.pack(side=tk.TOP)
+
     def handle_click(self, event):
+        self.cancel_search()
         clicked_node = self.get_clicked_node(event.x, event.y)
 
-        if not clicked_node:
+        if clicked_node is None:
             label = simpledialog.askstring("Node Label", "Enter node label:")
             if label is not None:
-                new_node = Node(label, event.x, event.y)
-                self.graph.append(new_node)
+                x, y = self.to_world(event.x, event.y)
+                try:
+                    new_node = self.graph.add_node(label, x, y)
+                except ValueError as error:
+                    tkinter.messagebox.showerror("Node Label", str(error))
+                    return
+                self.spatial_index.insert(new_node, x, y)
+                self.draw_node(new_node)
                 self.reset_colors()  # Reset colors when adding a new node
-                self.draw_graph()
+                self.replan([new_node])
 
         else:
-            if not self.selected_node:
+            if self.selected_node is None:
                 self.selected_node = clicked_node
             else:
                 if self.selected_node != clicked_node:
-                    edge_label = simpledialog.askstring("Edge Label", "Enter edge label:")
+                    edge_label = simpledialog.askstring("Edge Label", "Enter edge label (a number is used as the edge weight):")
                     if edge_label is not None:
-                        new_connection = Connection(self.selected_node, clicked_node, edge_label)
-                        self.connections.append(new_connection)
-                        self.reset_colors()  # Reset colors when adding a new connection
-                        self.draw_connections()
+                        try:
+                            new_connection = self.graph.add_connection(self.selected_node, clicked_node, edge_label)
+                        except ValueError as error:
+                            tkinter.messagebox.showerror("Edge Label", str(error))
+                        else:
+                            self.index_connection(new_connection)
+                            self.draw_connection(new_connection)
+                            self.canvas.tag_lower('edge')
+                            self.reset_colors()  # Reset colors when adding a new connection
+                            self.replan([self.selected_node, clicked_node])
 
                 self.selected_node = None
 
     def get_clicked_node(self, x, y):
+        x, y = self.to_world(x, y)
+        return self.spatial_index.nearest(x, y, NODE_RADIUS)
+
+    def to_world(self, x, y):
+        return x / self.zoom + self.offset_x, y / self.zoom + self.offset_y
+
+    def to_screen(self, x, y):
+        return (x - self.offset_x) * self.zoom, (y - self.offset_y) * self.zoom
+
+    def rebuild_spatial_index(self):
+        self.spatial_index.clear()
         for node in self.graph:
-            if (x - 20) <= node.x <= (x + 20) and (y - 20) <= node.y <= (y + 20):
-                return node
-        return None
+            self.spatial_index.insert(node, *self.graph.position(node))
+        self.edge_index.clear()
+        for connection in self.graph.connections():
+            self.index_connection(connection)
+
+    def index_connection(self, connection):
+        node1, node2 = self.graph.endpoints(connection)
+        self.edge_index.insert(connection, *self.graph.position(node1), *self.graph.position(node2))
 
     def draw_graph(self):
+        # Full rebuild of the visible part of the canvas, e.g. after loading a graph or zooming
         self.canvas.delete("all")
-
-        for node in self.graph:
-            x, y = node.x, node.y
-            color = 'green' if node == self.start_node else 'red' if node == self.goal_node else node.color
-            self.canvas.create_oval(x - 20, y - 20, x + 20, y + 20, fill=color, outline='black')
-            self.canvas.create_text(x, y, text=node.label, font=("Helvetica", 20, "bold"))
-
-        self.draw_connections()
-
-    def draw_connections(self):
-        for connection in self.connections:
-            x1, y1 = connection.node1.x, connection.node1.y
-            x2, y2 = connection.node2.x, connection.node2.y
-            self.canvas.create_line(x1, y1, x2, y2, fill='black', width=1)
+        self.node_items = {}
+        self.edge_items = {}
+        self.dirty_nodes = set()
+        self.update_viewport()
+
+    def update_viewport(self):
+        # Only nodes inside the visible area (plus a margin) get canvas items, along with
+        # the connections that cross it, including long ones whose ends are both out of
+        # view. Items that scrolled out of view are deleted.
+        self.viewport_dirty = False
+        width = max(self.canvas.winfo_width(), int(self.canvas.cget('width')))
+        height = max(self.canvas.winfo_height(), int(self.canvas.cget('height')))
+        x0, y0 = self.to_world(0, 0)
+        x1, y1 = self.to_world(width, height)
+        area = (x0 - NODE_RADIUS, y0 - NODE_RADIUS, x1 + NODE_RADIUS, y1 + NODE_RADIUS)
+        visible = {node for node, _, _ in self.spatial_index.query(*area)}
+        visible_connections = set(self.edge_index.query(*area))
+
+        for node in [node for node in self.node_items if node not in visible]:
+            self.canvas.delete(*self.node_items.pop(node))
+        for connection in [connection for connection in self.edge_items if connection not in visible_connections]:
+            self.erase_connection(connection)
+
+        for node in visible:
+            if node not in self.node_items:
+                self.draw_node(node)
+        for connection in visible_connections:
+            if connection not in self.edge_items:
+                self.draw_connection(connection)
+        self.canvas.tag_lower('edge')  # Keep edges underneath the nodes
+
+    def node_fill(self, node):
+        if node == self.start_node:
+            return 'green'
+        if node == self.goal_node:
+            return 'red'
+        return self.node_colors.get(node, 'lightblue')
+
+    def draw_node(self, node):
+        x, y = self.to_screen(*self.graph.position(node))
+        radius = NODE_RADIUS * self.zoom
+        items = [self.canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill=self.node_fill(node), outline='black', tags=('node',))]
+        font_size = round(20 * self.zoom)
+        if font_size >= MIN_FONT_SIZE:  # Labels are left out when zoomed too far out to read them
+            items.append(self.canvas.create_text(x, y, text=self.graph.label(node), font=("Helvetica", font_size, "bold"), tags=('node',)))
+        self.node_items[node] = tuple(items)
+
+    def draw_connection(self, connection):
+        node1, node2 = self.graph.endpoints(connection)
+        x1, y1 = self.to_screen(*self.graph.position(node1))
+        x2, y2 = self.to_screen(*self.graph.position(node2))
+        items = [self.canvas.create_line(x1, y1, x2, y2, fill='black', width=1, tags=('edge',))]
+        if round(10 * self.zoom) >= MIN_FONT_SIZE:
             mid_x = (x1 + x2) / 2
             mid_y = (y1 + y2) / 2
-            self.canvas.create_text(mid_x, mid_y, text=connection.edge_label)
+            items.append(self.canvas.create_text(mid_x, mid_y, text=self.graph.edge_label(connection), tags=('edge',)))
+        self.edge_items[connection] = tuple(items)
+
+    def erase_node(self, node):
+        for connection in self.graph.connections_of(node):
+            self.erase_connection(connection)
+            self.edge_index.remove(connection)
+        self.canvas.delete(*self.node_items.pop(node, ()))
+        self.dirty_nodes.discard(node)
+        self.spatial_index.remove(node, *self.graph.position(node))
+
+    def erase_connection(self, connection):
+        self.canvas.delete(*self.edge_items.pop(connection, ()))
+
+    def start_pan(self, event):
+        self.pan_position = (event.x, event.y)
+
+    def pan(self, event):
+        dx, dy = event.x - self.pan_position[0], event.y - self.pan_position[1]
+        self.pan_position = (event.x, event.y)
+        self.canvas.move('all', dx, dy)  # Shift the existing items instead of recreating them
+        self.offset_x -= dx / self.zoom
+        self.offset_y -= dy / self.zoom
+        self.viewport_dirty = True
+        self.schedule_redraw()
+
+    def zoom_view(self, event):
+        zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+        zoom = min(max(self.zoom * (1.25 if zoom_in else 0.8), MIN_ZOOM), MAX_ZOOM)
+        world_x, world_y = self.to_world(event.x, event.y)  # Keep the point under the mouse in place
+        self.zoom = zoom
+        self.offset_x = world_x - event.x / zoom
+        self.offset_y = world_y - event.y / zoom
+        self.draw_graph()
+
+    def mark_dirty(self, node):
+        if node is not None:
+            self.dirty_nodes.add(node)
+            self.schedule_redraw()
+
+    def schedule_redraw(self):
+        # Coalesce all color and viewport changes made before the event loop goes idle into one pass
+        if self.redraw_pending is None:
+            self.redraw_pending = self.master.after_idle(self.flush_redraw)
+
+    def flush_redraw(self):
+        self.redraw_pending = None
+        if self.viewport_dirty:
+            self.update_viewport()
+        for node in self.dirty_nodes:
+            items = self.node_items.get(node)
+            if items is not None:
+                self.canvas.itemconfig(items[0], fill=self.node_fill(node))
+        self.dirty_nodes = set()
 
     def select_nodes(self):
         start_label = simpledialog.askstring("Select Start Node", "Enter the label of the start node:")
         goal_label = simpledialog.askstring("Select Goal Node", "Enter the label of the goal node:")
+        self.cancel_search()
 
+        self.mark_dirty(self.start_node)  # The old start and goal go back to their normal color
+        self.mark_dirty(self.goal_node)
         self.start_node = self.find_node_by_label(start_label)
         self.goal_node = self.find_node_by_label(goal_label)
+        self.mark_dirty(self.start_node)
+        self.mark_dirty(self.goal_node)
 
-        if self.start_node and self.goal_node:
+        if self.start_node is not None and self.goal_node is not None:
             self.reset_colors()  # Reset colors when selecting start and goal nodes
             self.update_node_color(self.start_node, 'green')
             self.update_node_color(self.goal_node, 'red')
 
         self.print_graph_info()
 
-    def run_bfs(self):
-        if not self.start_node or not self.goal_node:
+    def run_search(self, algorithm, **options):
+        if self.start_node is None or self.goal_node is None:
             print("Please select start and goal nodes first.")
             return
 
-        self.reset_colors()  # Reset colors before running BFS
-
-        bfs_queue = Queue()
-        visited = set()
-
-        bfs_queue.put(self.start_node)
-        visited.add(self.start_node)
-
-        enqueue_count = 0
-        extensions_count = 0
-        queue_size = 0
-        path_elements = []
-        path_cost = 0
-
-        while not bfs_queue.empty():
-            current_node = bfs_queue.get()
-            self.update_node_color(current_node, 'blue')  # Mark as visited
+        self.cancel_search()  # Only one search is animated at a time
+        self.reset_colors()  # Reset colors before running the search
 
-            for connection in self.connections:
-                if connection.node1 == current_node and connection.node2 not in visited:
-                    bfs_queue.put(connection.node2)
-                    visited.add(connection.node2)
-
-                if connection.node2 == current_node and connection.node1 not in visited:
-                    bfs_queue.put(connection.node1)
-                    visited.add(connection.node1)
-
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
-
-            # Update BFS information labels
-            enqueue_count += 1
-            extensions_count += len(self.connections)  # Assuming each connection represents a potential extension
-            queue_size = bfs_queue.qsize()
-            path_elements.append(current_node.label)
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.queue_size_label.config(text=f"Queue Size: {queue_size}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
+        writer = None
+        if self.record_trace_var.get():
+            path = filedialog.asksaveasfilename(title="Record Trace", defaultextension=".trace", filetypes=TRACE_FILE_TYPES)
+            if not path:
+                return
+            try:
+                writer = TraceWriter(path, self.graph, self.start_node, self.goal_node, algorithm, **options)
+            except OSError as error:
+                tkinter.messagebox.showerror("Record Trace", str(error))
+                return
 
-    def run_dfs(self):
-        if not self.start_node or not self.goal_node:
-            print("Please select start and goal nodes first.")
+        cached = None
+        if writer is None:  # A recorded search has to actually run
+            cached = self.result_cache.get(self.graph, self.start_node, self.goal_node, algorithm, **options)
+        if cached is not None:
+            # Same query on an unchanged graph: show the earlier result without searching again
+            for node in cached.visited:
+                self.update_node_color(node, 'blue')
+            self.update_search_labels(cached)
+            print("Goal reached! (cached)" if cached.found else "No path found. (cached)")
+            return cached
+
+        # The search runs step by step from the event loop; result fills in as it goes
+        result = SearchResult(algorithm)
+        steps = iter_search(self.graph, self.start_node, self.goal_node, algorithm, result,
+                            emit=writer.emit if writer is not None else None, **options)
+
+        def on_finish(completed):
+            self.pause_button.config(text="Pause")
+            if writer is not None:
+                writer.close()  # A cancelled search leaves a trace of the steps taken so far
+            if completed:
+                self.result_cache.put(self.graph, self.start_node, self.goal_node, algorithm, result, **options)
+                print("Goal reached!" if result.found else "No path found.")
+            else:
+                print("Search cancelled.")
+
+        self.animation = SearchAnimation(
+            self.master, steps,
+            on_step=lambda current_node: self.update_node_color(current_node, 'blue'),  # Mark as visited
+            on_frame=lambda: self.update_search_labels(result),
+            on_finish=on_finish,
+            delay=self.speed_scale.get(),
+        )
+        self.animation.start()
+        return result
+
+    def set_animation_delay(self, delay):
+        if self.animation is not None:
+            self.animation.set_delay(int(float(delay)))
+
+    def toggle_pause(self):
+        if self.animation is None or not self.animation.running:
+            if self.trace_player is not None and not self.trace_player.done:
+                self.replay_trace()  # Play on from wherever the slider left the trace
+            return
+        if self.animation.paused:
+            self.animation.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            self.animation.pause()
+            self.pause_button.config(text="Resume")
+
+    def step_search(self):
+        if self.animation is not None and self.animation.running:
+            if not self.animation.paused:
+                self.toggle_pause()
+            self.animation.step()
+        elif self.trace_player is not None:
+            self.show_trace_nodes({self.trace_player.step()})
+
+    def finish_search(self):
+        if self.animation is not None:
+            self.animation.finish()
+        elif self.trace_player is not None:
+            self.show_trace_nodes(self.trace_player.seek(len(self.trace_player)))
+
+    def cancel_search(self):
+        # Also called before any edit, since a running search must not see the graph change
+        if self.animation is not None:
+            self.animation.cancel()
+            self.animation = None
+        if self.trace_player is not None:
+            self.trace_player = None  # The trace no longer matches what is on screen
+            self.trace_nodes = {}
+            self.trace_scale.config(to=0)
+
+    def load_trace(self):
+        path = filedialog.askopenfilename(title="Load Trace", filetypes=TRACE_FILE_TYPES)
+        if not path:
             return
 
-        self.reset_colors()  # Reset colors before running DFS
-
-        dfs_stack = [self.start_node]
-        visited = set()
-
-        enqueue_count = 0
-        extensions_count = 0
-        queue_size = 0
-        path_elements = []
-        path_cost = 0
-
-        while dfs_stack:
-            current_node = dfs_stack.pop()
-            self.update_node_color(current_node, 'blue')  # Mark as visited
-
-            for connection in self.connections:
-                if connection.node1 == current_node and connection.node2 not in visited:
-                    dfs_stack.append(connection.node2)
-                    visited.add(connection.node2)
-
-                if connection.node2 == current_node and connection.node1 not in visited:
-                    dfs_stack.append(connection.node1)
-                    visited.add(connection.node1)
-
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
-
-            # Update DFS information labels
-            enqueue_count += 1
-            extensions_count += len(self.connections)  # Assuming each connection represents a potential extension
-            queue_size = len(dfs_stack)
-            path_elements.append(current_node.label)
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.queue_size_label.config(text=f"Queue Size: {queue_size}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
-
-
-    def run_hill_climbing(self):
-        if not self.start_node or not self.goal_node:
-            print("Please select start and goal nodes first.")
+        try:
+            trace = load_trace(path)
+        except (OSError, ValueError, KeyError, IndexError) as error:
+            tkinter.messagebox.showerror("Load Trace", str(error))
             return
 
-        self.reset_colors()  # Reset colors before running Hill Climbing
+        # Traces store node indices, so they only replay on the graph they were recorded on
+        nodes = {self.graph.index(node): node for node in self.graph}
+        header = trace.header
+        if (header.get('node_count') != len(self.graph.xs) or header.get('start') not in nodes
+                or header.get('goal') not in nodes):
+            tkinter.messagebox.showerror("Load Trace", "The trace was recorded on a different graph.")
+            return
 
-        current_node = self.start_node
-        visited = set([current_node])
+        self.cancel_search()
+        self.mark_dirty(self.start_node)
+        self.mark_dirty(self.goal_node)
+        self.start_node = nodes[header['start']]
+        self.goal_node = nodes[header['goal']]
+        self.mark_dirty(self.start_node)
+        self.mark_dirty(self.goal_node)
+        self.reset_colors()
+
+        self.trace_player = TracePlayer(trace)
+        self.trace_nodes = nodes
+        self.trace_scale.config(to=len(trace))
+        self.trace_scale.set(0)
+        print(f"Replaying {header['algorithm']} trace of {len(trace)} events.")
+        self.replay_trace()
+
+    def replay_trace(self):
+        # Replays the loaded trace from its current position at the speed set by the delay slider
+        player = self.trace_player
+        if self.animation is not None:
+            self.animation.cancel()
+
+        def steps():
+            while not player.done:
+                yield player.step()
+
+        def on_finish(completed):
+            self.pause_button.config(text="Pause")
+            if completed:
+                print("Replay finished.")
+
+        self.animation = SearchAnimation(
+            self.master, steps(),
+            on_step=lambda index: self.show_trace_nodes((index,), update_labels=False),
+            on_frame=self.update_trace_labels,
+            on_finish=on_finish,
+            delay=self.speed_scale.get(),
+        )
+        self.pause_button.config(text="Pause")
+        self.animation.start()
+
+    def seek_trace(self, value):
+        player = self.trace_player
+        position = int(float(value))
+        if player is None or position == player.position:
+            return  # Also filters out the slider updates made by update_trace_labels
+        if self.animation is not None and self.animation.running and not self.animation.paused:
+            self.toggle_pause()  # Scrubbing takes over from the running replay
+        self.show_trace_nodes(player.seek(position))
+
+    def show_trace_nodes(self, indices, update_labels=True):
+        player = self.trace_player
+        for index in indices:
+            node = self.trace_nodes.get(index)
+            if node is None:
+                continue
+            color = player.color(index)
+            if color is None:
+                self.node_colors.pop(index, None)
+                self.mark_dirty(node)
+            else:
+                self.update_node_color(node, color)
+        if update_labels:
+            self.update_trace_labels()
+
+    def update_trace_labels(self):
+        # A trace holds events rather than the search state, so the frontier size and the
+        # duplicate count are not shown while replaying
+        player = self.trace_player
+        if player is None:
+            return
+        self.trace_scale.set(player.position)
+        self.enqueue_label.config(text=f"Enqueues: {player.counts[PUSH]}")
+        self.extensions_label.config(text=f"Extensions: {player.counts[EXPAND]}")
+        self.pruned_label.config(text=f"Pruned: {player.counts[PRUNE]}, Duplicates: -")
+        self.queue_size_label.config(text="Queue Size: -")
+        elided = "..., " if len(player.expanded) > MAX_LABELED_NODES else ""
+        visited = ', '.join(self.graph.label(self.trace_nodes[index]) for index in player.expanded[-MAX_LABELED_NODES:])
+        self.visited_label.config(text=f"Visited: {elided}{visited or 'None'}")
+        path = [self.trace_nodes[index] for index in player.path]
+        found = player.done and bool(path)
+        path_elements = ', '.join(self.graph.label(node) for node in path) if found else 'None'
+        self.path_elements_label.config(text=f"Path Elements: {path_elements}")
+        self.path_cost_label.config(text=f"Path Cost: {path_cost(self.graph, path):g}" if found else "Path Cost: -")
+
+    def update_search_labels(self, result):
+        # Enqueues count nodes added to the frontier and extensions count nodes expanded.
+        # Visited shows the latest expansions; the path and its cost only exist once the goal is reached.
+        self.enqueue_label.config(text=f"Enqueues: {result.enqueues}")
+        self.extensions_label.config(text=f"Extensions: {result.extensions}")
+        self.pruned_label.config(text=f"Pruned: {result.pruned}, Duplicates: {result.duplicates}")
+        self.queue_size_label.config(text=f"Queue Size: {result.queue_size} (max {result.max_queue_size})")
+        elided = "..., " if len(result.visited) > MAX_LABELED_NODES else ""
+        visited = ', '.join(self.graph.label(node) for node in result.visited[-MAX_LABELED_NODES:])
+        self.visited_label.config(text=f"Visited: {elided}{visited or 'None'}")
+        path_elements = ', '.join(self.graph.label(node) for node in result.path) if result.found else 'None'
+        self.path_elements_label.config(text=f"Path Elements: {path_elements}")
+        self.path_cost_label.config(text=f"Path Cost: {result.path_cost:g}" if result.found else "Path Cost: -")
 
-        enqueue_count = 0
-        extensions_count = 0
-        path_elements = []
-        path_cost = 0
+    def run_bfs(self):
+        return self.run_search('bfs')
 
-        while current_node != self.goal_node:
-            neighbors = self.get_neighbors(current_node, visited)
-            if not neighbors:
-                print("No path found.")
+    def run_dfs(self):
+        return self.run_search('dfs')
+
+    def run_depth_limited_dfs(self, depth_limit=None):
+        if depth_limit is None:
+            try:
+                depth_limit = self.depth_limit_var.get()
+            except tk.TclError:
+                depth_limit = -1
+            if depth_limit < 0:
+                tkinter.messagebox.showerror("Depth Limit", "Depth limit must be a whole number of at least 0.")
                 return
+        return self.run_search('depth_limited_dfs', depth_limit=depth_limit)
 
-            best_neighbor = self.get_best_neighbor(neighbors)
-            self.update_node_color(current_node, 'blue')  # Mark as visited
-
-            # Update Hill Climbing information labels
-            enqueue_count += 1
-            extensions_count += len(neighbors)
-            path_elements.append(current_node.label)
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
-
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
+    def run_iterative_deepening_dfs(self):
+        return self.run_search('iterative_deepening_dfs')
 
-            current_node = best_neighbor
-            visited.add(current_node)
-
-        print("Goal reached!")
-
-    def get_neighbors(self, current_node, visited):
-        neighbors = []
-
-        for connection in self.connections:
-            if connection.node1 == current_node and connection.node2 not in visited:
-                neighbors.append(connection.node2)
-
-            if connection.node2 == current_node and connection.node1 not in visited:
-                neighbors.append(connection.node1)
+    def run_hill_climbing(self):
+        return self.run_search('hill_climbing', heuristic=self.heuristic_var.get())
+
+    def run_beam_search(self, beam_width=None):
+        if beam_width is None:
+            try:
+                beam_width = self.beam_width_var.get()
+            except tk.TclError:
+                beam_width = 0
+            if beam_width < 1:
+                tkinter.messagebox.showerror("Beam Width", "Beam width must be a whole number of at least 1.")
+                return
+        return self.run_search('beam_search', beam_width=beam_width, heuristic=self.heuristic_var.get())
 
-        return neighbors
+    def run_branch_and_bound(self):
+        return self.run_search('branch_and_bound')
 
-    def get_best_neighbor(self, neighbors):
-        # You can customize the heuristic function here
-        # For simplicity, let's use the Euclidean distance as the heuristic
-        def heuristic(node):
-            return math.sqrt((node.x - self.goal_node.x)**2 + (node.y - self.goal_node.y)**2)
+    def run_a_star(self):
+        return self.run_search('a_star', heuristic=self.heuristic_var.get())
 
-        return min(neighbors, key=heuristic)
+    def run_bidirectional_bfs(self):
+        return self.run_search('bidirectional_bfs')
 
+    def run_bidirectional_a_star(self):
+        return self.run_search('bidirectional_a_star', heuristic=self.heuristic_var.get())
 
-    def run_beam_search(self, beam_width=2):
-        if not self.start_node or not self.goal_node:
+    def run_incremental_a_star(self):
+        # The planner is kept while the start, goal and heuristic stay the same, so running
+        # it again (or editing the graph) only repairs what changed since the last run
+        if self.start_node is None or self.goal_node is None:
             print("Please select start and goal nodes first.")
             return
 
-        self.reset_colors()  # Reset colors before running Beam Search
-
-        beam = [(0, [self.start_node])]  # Priority queue with (cost, path) tuples
-        visited = set([self.start_node])
-
-        enqueue_count = 0
-        extensions_count = 0
-        queue_size = 0
-        path_elements = []
-        path_cost = 0
-
-        while beam:
-            _, current_path = heapq.heappop(beam)
-            current_node = current_path[-1]
-
-            if current_node == self.goal_node:
-                # Goal reached
-                path_cost = len(current_path) - 1  # The cost is the number of edges traversed
-                break
-
-            neighbors = self.get_neighbors(current_node, visited)
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    new_path = current_path + [neighbor]
-                    cost = len(new_path) - 1  # The cost is the number of edges traversed
-                    heapq.heappush(beam, (cost, new_path))
-                    visited.add(neighbor)
-
-            # Update Beam Search information labels
-            enqueue_count += 1
-            extensions_count += len(neighbors)
-            queue_size = len(beam)
-            path_elements = [node.label for node in current_path]
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.queue_size_label.config(text=f"Queue Size: {queue_size}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
-
-            self.update_node_color(current_node, 'blue')  # Mark as visited
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
-
-        print("Goal reached!")
-
-    def run_branch_and_bound(self):
-        if not self.start_node or not self.goal_node:
-            print("Please select start and goal nodes first.")
+        heuristic = self.heuristic_var.get()
+        planner = self.planner
+        if planner is None or (planner.graph, planner.start, planner.goal, planner.heuristic) != (
+                self.graph, self.start_node, self.goal_node, heuristic):
+            planner = self.planner = IncrementalAStar(self.graph, self.start_node, self.goal_node, heuristic)
+
+        self.cancel_search()
+        self.reset_colors()
+        result = SearchResult('incremental_a_star')
+        steps = planner.iter_search(result)
+
+        def on_finish(completed):
+            self.pause_button.config(text="Pause")
+            if completed:
+                print("Goal reached!" if result.found else "No path found.")
+            else:
+                print("Search cancelled.")
+
+        self.animation = SearchAnimation(
+            self.master, steps,
+            on_step=lambda current_node: self.update_node_color(current_node, 'blue'),  # Only the repaired part is shown
+            on_frame=lambda: self.update_search_labels(result),
+            on_finish=on_finish,
+            delay=self.speed_scale.get(),
+        )
+        self.animation.start()
+        return result
+
+    def replan(self, nodes):
+        # Tells the incremental planner about an edit, given the nodes whose edges changed,
+        # and repairs its path straight away. Does nothing until the planner has been run.
+        planner = self.planner
+        if planner is None:
             return
-
-        self.reset_colors()  # Reset colors before running Branch and Bound
-
-        priority_queue = [(0, [self.start_node])]  # Priority queue with (cost, path) tuples
-        visited = set([self.start_node])
-
-        enqueue_count = 0
-        extensions_count = 0
-        queue_size = 0
-        path_elements = []
-        path_cost = 0
-
-        while priority_queue:
-            _, current_path = heapq.heappop(priority_queue)
-            current_node = current_path[-1]
-
-            if current_node == self.goal_node:
-                # Goal reached
-                path_cost = len(current_path) - 1  # The cost is the number of edges traversed
-                break
-
-            neighbors = self.get_neighbors(current_node, visited)
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    new_path = current_path + [neighbor]
-                    cost = len(new_path) - 1  # The cost is the number of edges traversed
-                    heapq.heappush(priority_queue, (cost, new_path))
-                    visited.add(neighbor)
-
-            # Update Branch and Bound information labels
-            enqueue_count += 1
-            extensions_count += len(neighbors)
-            queue_size = len(priority_queue)
-            path_elements = [node.label for node in current_path]
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.queue_size_label.config(text=f"Queue Size: {queue_size}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
-
-            self.update_node_color(current_node, 'blue')  # Mark as visited
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
-
-        print("Goal reached!")
-
-    def run_a_star(self):
-        if not self.start_node or not self.goal_node:
-            print("Please select start and goal nodes first.")
+        if (planner.graph, planner.start, planner.goal) != (self.graph, self.start_node, self.goal_node):
+            self.planner = None  # Start or goal changed or was deleted
             return
-
-        self.reset_colors()  # Reset colors before running A*
-
-        priority_queue = [(0 + self.heuristic(self.start_node), 0, [self.start_node])]  # Priority queue with (f-cost, g-cost, path) tuples
-        visited = set([self.start_node])
-
-        enqueue_count = 0
-        extensions_count = 0
-        queue_size = 0
-        path_elements = []
-        path_cost = 0
-
-        while priority_queue:
-            _, g_cost, current_path = heapq.heappop(priority_queue)
-            current_node = current_path[-1]
-
-            if current_node == self.goal_node:
-                # Goal reached
-                path_cost = len(current_path) - 1  # The cost is the number of edges traversed
-                break
-
-            neighbors = self.get_neighbors(current_node, visited)
-            for neighbor in neighbors:
-                if neighbor not in visited:
-                    new_path = current_path + [neighbor]
-                    g_cost_new = g_cost + 1  # Assuming each edge has a cost of 1
-                    f_cost = g_cost_new + self.heuristic(neighbor)
-                    heapq.heappush(priority_queue, (f_cost, g_cost_new, new_path))
-                    visited.add(neighbor)
-
-            # Update A* information labels
-            enqueue_count += 1
-            extensions_count += len(neighbors)
-            queue_size = len(priority_queue)
-            path_elements = [node.label for node in current_path]
-
-            # Update labels
-            self.enqueue_label.config(text=f"Enqueues: {enqueue_count}")
-            self.extensions_label.config(text=f"Extensions/Paths: {extensions_count}")
-            self.queue_size_label.config(text=f"Queue Size: {queue_size}")
-            self.path_elements_label.config(text=f"Path Elements: {', '.join(path_elements)}")
-            self.path_cost_label.config(text=f"Path Cost: {path_cost}")
-
-            self.update_node_color(current_node, 'blue')  # Mark as visited
-            self.draw_graph()
-            self.master.update()  # Update the window to show the changes
-            self.master.after(1000)  # Pause for visualization (adjust as needed)
-
-        print("Goal reached!")
-
-    def heuristic(self, node):
-        # Euclidean distance as the heuristic
-        return math.sqrt((node.x - self.goal_node.x)**2 + (node.y - self.goal_node.y)**2)
+        planner.update(nodes)
+        self.run_incremental_a_star()
 
     def delete_node(self):
         node_label = simpledialog.askstring("Delete Node", "Enter the label of the node to delete:")
         node_to_delete = self.find_node_by_label(node_label)
 
-        if node_to_delete:
-            self.graph.remove(node_to_delete)
-            self.connections = [conn for conn in self.connections if conn.node1 != node_to_delete and conn.node2 != node_to_delete]
+        if node_to_delete is not None:
+            self.cancel_search()
+            neighbors = self.graph.neighbors(node_to_delete)
+            self.erase_node(node_to_delete)
+            self.graph.remove_node(node_to_delete)  # Also drops the node's connections
+            if node_to_delete in (self.start_node, self.goal_node):
+                self.start_node = self.goal_node = None
             self.reset_colors()  # Reset colors after deleting a node
-            self.draw_graph()
+            self.replan([node_to_delete, *neighbors])
 
     def delete_edge(self):
         edge_label = simpledialog.askstring("Delete Edge", "Enter the label of the edge to delete:")
-        self.connections = [conn for conn in self.connections if conn.edge_label != edge_label]
+        self.cancel_search()
+        changed = []
+        for connection in self.graph.find_connections(edge_label):
+            self.erase_connection(connection)
+            self.edge_index.remove(connection)
+            changed += self.graph.endpoints(connection)
+            self.graph.remove_connection(connection)
         self.reset_colors()  # Reset colors after deleting an edge
-        self.draw_graph()
+        if changed:
+            self.replan(changed)
 
     def clear_graph(self):
         response = tkinter.messagebox.askyesno("Clear Graph", "Are you sure you want to clear the graph?")
         if response:
-            self.graph = []
-            self.connections = []
+            self.cancel_search()
+            self.graph.clear()
+            self.planner = None
+            self.spatial_index.clear()
+            self.edge_index.clear()
             self.start_node = None
             self.goal_node = None
             self.selected_node = None
-            self.reset_colors()
+            self.node_colors = {}
             self.draw_graph()
             self.print_graph_info()
 
+    def save_graph(self):
+        path = filedialog.asksaveasfilename(title="Save Graph", defaultextension=".txt", filetypes=GRAPH_FILE_TYPES)
+        if path:
+            graph_io.save_graph(self.graph, path)
+
+    def load_graph(self):
+        path = filedialog.askopenfilename(title="Load Graph", filetypes=GRAPH_FILE_TYPES)
+        if not path:
+            return
+
+        try:
+            graph = graph_io.load_graph(path)
+        except (OSError, ValueError) as error:
+            tkinter.messagebox.showerror("Load Graph", str(error))
+            return
+
+        self.cancel_search()
+        if isinstance(graph, CSRGraph):
+            with graph:
+                graph = graph_io.csr_to_graph(graph)  # The editor needs a graph it can edit
+
+        self.graph = graph
+        self.planner = None
+        self.rebuild_spatial_index()
+        self.start_node = None
+        self.goal_node = None
+        self.selected_node = None
+        self.node_colors = {}
+        self.draw_graph()
+        self.print_graph_info()
+
     def find_node_by_label(self, label):
-        for node in self.graph:
-            if node.label == label:
-                return node
-        return None
+        return self.graph.find_node(label)
+
+    # Bulk editing for scripted graph construction: each call changes the graph in one go
+    # and redraws once, instead of once per node or edge.
+
+    def add_nodes(self, nodes):
+        # nodes: (label, x, y) tuples. Returns the new node ids.
+        self.cancel_search()
+        nodes = self.graph.add_nodes(nodes)
+        for node in nodes:
+            self.spatial_index.insert(node, *self.graph.position(node))
+        self.redraw_after_bulk_edit()
+        self.replan(nodes)
+        return nodes
+
+    def add_connections(self, connections):
+        # connections: (node1, node2, edge label) tuples. Returns the new connection ids.
+        self.cancel_search()
+        connections = self.graph.add_connections(connections)
+        for connection in connections:
+            self.index_connection(connection)
+        self.redraw_after_bulk_edit()
+        self.replan([node for connection in connections for node in self.graph.endpoints(connection)])
+        return connections
+
+    def remove_nodes(self, nodes):
+        self.cancel_search()
+        nodes = list(dict.fromkeys(nodes))
+        neighbors = [neighbor for node in nodes if node in self.graph for neighbor in self.graph.neighbors(node)]
+        incident = dict.fromkeys(connection for node in nodes if node in self.graph for connection in self.graph.connections_of(node))
+        self.graph.remove_nodes(nodes)
+        for node in nodes:
+            self.spatial_index.remove(node, *self.graph.position(node))
+        for connection in incident:
+            self.edge_index.remove(connection)
+        if self.start_node in nodes or self.goal_node in nodes:
+            self.start_node = self.goal_node = None
+        self.redraw_after_bulk_edit()
+        self.replan(nodes + neighbors)
+
+    def remove_connections(self, connections):
+        self.cancel_search()
+        connections = list(connections)
+        self.graph.remove_connections(connections)
+        for connection in dict.fromkeys(connections):
+            self.edge_index.remove(connection)
+        self.redraw_after_bulk_edit()
+        self.replan([node for connection in connections for node in self.graph.endpoints(connection)])
+
+    def relabel_nodes(self, mapping):
+        self.cancel_search()
+        self.graph.relabel_nodes(mapping)
+        self.redraw_after_bulk_edit()
+        self.replan([])  # Labels do not change any path
+
+    def relabel_connections(self, mapping):
+        # mapping: connection id -> new edge label. Edge labels are weights, so the ends
+        # of every relabelled connection are replanned.
+        self.cancel_search()
+        self.graph.relabel_connections(mapping)
+        self.redraw_after_bulk_edit()
+        self.replan([node for connection in mapping for node in self.graph.endpoints(connection)])
+
+    def redraw_after_bulk_edit(self):
+        self.node_colors = {}
+        self.draw_graph()
 
     def update_node_color(self, node, color):
-        node.color = color
-        self.draw_graph()
+        self.node_colors[node] = color
+        self.dirty_nodes.add(node)
+        self.schedule_redraw()
 
     def reset_colors(self):
-        for node in self.graph:
-            node.color = 'lightblue'
-        self.draw_graph()
+        # Only the nodes that currently have a color need their items touched
+        self.dirty_nodes.update(self.node_colors)
+        self.node_colors = {}  # Nodes without an entry are drawn light blue
+        self.schedule_redraw()
 
     def print_graph_info(self):
         print("\nGraph Information:")
         print("Nodes:")
         for node in self.graph:
-            print(f"  {node.label}")
+            print(f"  {self.graph.label(node)}")
 
         print("\nConnections:")
-        for connection in self.connections:
-            print(f"  {connection.node1.label} --({connection.edge_label})--> {connection.node2.label}")
+        for connection in self.graph.connections():
+            node1, node2 = self.graph.endpoints(connection)
+            print(f"  {self.graph.label(node1)} --({self.graph.edge_label(connection)})--> {self.graph.label(node2)}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,992 @@
+import heapq
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from heuristics import HEURISTICS, heuristic_table
+
+# Headless search engine. Nothing in here imports tkinter, so it can be used
+# from scripts and batch jobs as well as from the GraphEditor GUI.
+#
+# Each algorithm is a generator that yields the node it expands at every step
+# and fills in a SearchResult as it goes. search() just drains the generator at
+# full speed; the GUI consumes it one step at a time to animate the run.
+#
+# Counters kept by every algorithm:
+#     expansions  nodes taken off the frontier and expanded (also the length of visited)
+#     generated   nodes added to the frontier, including the start node
+#     duplicates  additions of a node that was already on the frontier (a cheaper
+#                 route found later), which are skipped when the stale copy is popped
+#     pruned      neighbours looked at but not added: already seen, not cheaper, or
+#                 cut by the beam / hill-climbing choice
+# timings holds seconds spent in each phase: 'heuristic' (building the heuristic
+# table), 'path' (rebuilding the path), 'search' (everything else) and 'total'.
+# Only time spent inside the search counts, not pauses between animation steps.
+#
+# Searches can also report every step as an event through an emit(event, node, parent)
+# hook: PUSH when a node is added to the frontier (parent is the node it was reached
+# from), PRUNE when a neighbour is rejected or dropped, EXPAND when a node is expanded,
+# and once the goal is reached one GOAL event per path node, from the start to the
+# goal. search_trace.py writes these events to trace files. Without a hook the
+# algorithms only pay for an "is not None" test per neighbour.
+
+EXPAND, PUSH, PRUNE, GOAL = 'expand', 'push', 'prune', 'goal'
+
+class SearchResult:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.path = None  # List of nodes from start to goal, None if the goal was not reached
+        self.path_cost = 0  # Sum of the edge weights along path
+        self.visited = []  # Nodes in the order they were expanded
+        self.expansions = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.pruned = 0
+        self.queue_size = 0
+        self.max_queue_size = 0
+        self.timings = {}
+        self.emit = None  # Event hook, see iter_search
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    @property
+    def path_length(self):
+        # Number of edges on the path
+        return len(self.path) - 1 if self.path is not None else None
+
+    # The names used by the GUI counters: an "enqueue" adds a node to the frontier
+    # and an "extension" expands one.
+    @property
+    def enqueues(self):
+        return self.generated
+
+    @property
+    def extensions(self):
+        return self.expansions
+
+    def update_queue_size(self, size):
+        self.queue_size = size
+        self.max_queue_size = max(self.max_queue_size, size)
+
+    def set_path(self, graph, path, cost=None):
+        self.path = path
+        self.path_cost = path_cost(graph, path) if cost is None else cost
+        if self.emit is not None:
+            for previous, node in zip([None] + path, path):
+                self.emit(GOAL, node, previous)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def metrics(self, graph=None):
+        # Plain dict of everything measured, e.g. for JSON output. With the graph that was
+        # searched the path is given as node labels, otherwise as node ids.
+        label = graph.label if graph is not None else int
+        return {
+            'algorithm': self.algorithm,
+            'found': self.found,
+            'path': [label(node) for node in self.path] if self.found else None,
+            'path_cost': self.path_cost,
+            'path_length': self.path_length,
+            'expansions': self.expansions,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'pruned': self.pruned,
+            'max_queue_size': self.max_queue_size,
+            'timings': dict(self.timings),
+        }
+
+def path_cost(graph, path):
+    # Sum of the cheapest edge between each pair of consecutive nodes
+    weight = graph.weight
+    return sum(weight(node, next_node) for node, next_node in zip(path, path[1:]))
+
+def reconstruct_path(parents, goal):
+    path = [goal]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    path.reverse()
+    return path
+
+def bfs(graph, start, goal, result):
+    # The goal is checked as soon as it is generated: the first time BFS reaches a node
+    # it is along a path with the fewest edges, so the rest of the layer can be skipped.
+    bfs_queue = deque([start])
+    parents = {start: None}
+    emit = result.emit
+    result.generated += 1
+
+    while bfs_queue and goal not in parents:
+        current_node = bfs_queue.popleft()
+        frontier_size = len(bfs_queue)
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+
+        neighbors = graph.neighbors(current_node)
+        for neighbor in neighbors:
+            if neighbor not in parents:
+                bfs_queue.append(neighbor)
+                parents[neighbor] = current_node
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+            elif emit is not None:
+                emit(PRUNE, neighbor, current_node)
+
+        added = len(bfs_queue) - frontier_size
+        result.generated += added
+        result.pruned += len(neighbors) - added
+        result.expansions += 1
+        result.update_queue_size(len(bfs_queue))
+        result.visited.append(current_node)
+        yield current_node
+
+    if goal in parents:
+        with result.phase('path'):
+            result.set_path(graph, reconstruct_path(parents, goal))
+
+def dfs(graph, start, goal, result):
+    # Nodes are marked visited when they are popped, not when they are pushed, so the
+    # search always continues from the most recently expanded node. A node can be on
+    # the stack more than once; the extra copies are skipped when popped. Neighbours
+    # are pushed in reverse so they are explored in adjacency order.
+    dfs_stack = [(start, None)]  # (node, parent it was pushed from)
+    parents = {}  # Also the visited set
+    pushed = {start}
+    duplicates = 0
+    emit = result.emit
+    result.generated += 1
+
+    while dfs_stack:
+        current_node, parent = dfs_stack.pop()
+        if current_node in parents:
+            continue  # Stale copy, the node was already expanded
+        parents[current_node] = parent
+
+        if current_node == goal:
+            with result.phase('path'):
+                result.set_path(graph, reconstruct_path(parents, goal))
+            return
+
+        frontier_size = len(dfs_stack)
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        neighbors = graph.neighbors(current_node)
+        for neighbor in reversed(neighbors):
+            if neighbor not in parents:
+                if neighbor in pushed:
+                    duplicates += 1
+                else:
+                    pushed.add(neighbor)
+                dfs_stack.append((neighbor, current_node))
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+            elif emit is not None:
+                emit(PRUNE, neighbor, current_node)
+
+        added = len(dfs_stack) - frontier_size
+        result.generated += added
+        result.duplicates = duplicates
+        result.pruned += len(neighbors) - added
+        result.expansions += 1
+        result.update_queue_size(len(dfs_stack))
+        result.visited.append(current_node)
+        yield current_node
+
+def _depth_limited(graph, start, goal, result, depth_limit):
+    # DFS that does not expand nodes deeper than depth_limit edges from the start.
+    # On a graph the first route to a node is not always the shortest, so a node is
+    # expanded again if it is reached at a shallower depth than before; otherwise a
+    # deep detour could hide a path that fits within the limit. Returns True if the
+    # limit cut anything off, i.e. a deeper search might still find the goal.
+    stack = [(start, None, 0)]  # (node, parent, depth)
+    depths = {}  # Shallowest depth each node was expanded at
+    parents = {}
+    cutoff = False
+    emit = result.emit
+
+    while stack:
+        current_node, parent, depth = stack.pop()
+        if depths.get(current_node, math.inf) <= depth:
+            continue  # Already expanded at this depth or shallower
+        if current_node in depths:
+            result.duplicates += 1
+        depths[current_node] = depth
+        parents[current_node] = parent
+
+        if current_node == goal:
+            with result.phase('path'):
+                result.set_path(graph, reconstruct_path(parents, goal))
+            return False
+
+        neighbors = graph.neighbors(current_node)
+        if depth == depth_limit:
+            cutoff = cutoff or any(neighbor not in depths for neighbor in neighbors)
+            continue
+
+        frontier_size = len(stack)
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        for neighbor in reversed(neighbors):
+            if depth + 1 < depths.get(neighbor, math.inf):
+                stack.append((neighbor, current_node, depth + 1))
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+            elif emit is not None:
+                emit(PRUNE, neighbor, current_node)
+
+        added = len(stack) - frontier_size
+        result.generated += added
+        result.pruned += len(neighbors) - added
+        result.expansions += 1
+        result.update_queue_size(len(stack))
+        result.visited.append(current_node)
+        yield current_node
+
+    return cutoff
+
+def depth_limited_dfs(graph, start, goal, result, depth_limit=10):
+    # Finds a path of at most depth_limit edges if there is one
+    if depth_limit < 0:
+        raise ValueError("Depth limit must be at least 0")
+    result.generated += 1
+    yield from _depth_limited(graph, start, goal, result, depth_limit)
+
+def iterative_deepening_dfs(graph, start, goal, result, max_depth=None):
+    # Depth-limited DFS with limits 0, 1, 2, ... until the goal is found, so the path has
+    # the fewest edges and the work grows with the distance to the goal rather than the
+    # size of the graph. Stops early when a pass was not cut off by its limit, which
+    # means the whole component was searched.
+    if max_depth is not None and max_depth < 0:
+        raise ValueError("Maximum depth must be at least 0")
+    depth_limit = 0
+    result.generated += 1
+    while max_depth is None or depth_limit <= max_depth:
+        if depth_limit > 0:
+            # Every pass starts over from the start node
+            result.generated += 1
+            if result.emit is not None:
+                result.emit(PUSH, start, None)
+        cutoff = yield from _depth_limited(graph, start, goal, result, depth_limit)
+        if result.found or not cutoff:
+            return
+        depth_limit += 1
+
+def hill_climbing(graph, start, goal, result, heuristic='euclidean'):
+    # The frontier is the current node's unvisited neighbours; the best one is kept and
+    # the others are pruned.
+    with result.phase('heuristic'):
+        table = heuristic_table(graph, goal, heuristic)
+    index = graph.index
+    current_node = start
+    visited = set([current_node])
+    cost = 0
+    emit = result.emit
+    result.generated += 1
+
+    while current_node != goal:
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        all_neighbors = graph.neighbors(current_node)
+        neighbors = [neighbor for neighbor in all_neighbors if neighbor not in visited]
+        result.expansions += 1
+        result.generated += len(neighbors)
+        result.pruned += len(all_neighbors) - min(1, len(neighbors))
+        result.update_queue_size(len(neighbors))
+        result.visited.append(current_node)
+        if not neighbors:
+            if emit is not None:
+                for neighbor in all_neighbors:
+                    emit(PRUNE, neighbor, current_node)
+            yield current_node
+            return  # Stuck, no path found
+
+        best_neighbor = min(neighbors, key=lambda node: table[index(node)])
+        if emit is not None:
+            # Every unvisited neighbour is a candidate; all but the chosen one are dropped
+            for neighbor in neighbors:
+                emit(PUSH, neighbor, current_node)
+            for neighbor in all_neighbors:
+                if neighbor != best_neighbor:
+                    emit(PRUNE, neighbor, current_node)
+        yield current_node
+
+        cost += graph.weight(current_node, best_neighbor)
+        current_node = best_neighbor
+        visited.add(current_node)
+
+    result.set_path(graph, result.visited + [goal], cost)  # Hill climbing never backtracks
+
+def beam_search(graph, start, goal, result, beam_width=2, heuristic='euclidean'):
+    # Level-synchronous beam: every node in the current layer is expanded, then only the
+    # beam_width children closest to the goal (by heuristic) make up the next layer.
+    # heapq.nsmallest selects them in O(n log k), and the frontier never holds more than
+    # beam_width * branching nodes.
+    if beam_width < 1:
+        raise ValueError("Beam width must be at least 1")
+    with result.phase('heuristic'):
+        table = heuristic_table(graph, goal, heuristic)
+    index = graph.index
+
+    layer = [start]
+    parents = {start: None}
+    emit = result.emit
+    result.generated += 1
+
+    while layer:
+        candidates = {}  # Child -> parent, for children not seen in any earlier layer
+
+        for current_node in layer:
+            if current_node == goal:
+                with result.phase('path'):
+                    # Priced from graph.weight, which picks the cheapest of parallel edges
+                    result.set_path(graph, reconstruct_path(parents, goal))
+                return
+
+            if emit is not None:
+                emit(EXPAND, current_node, None)
+            for neighbor, _ in graph.edges(current_node):
+                if neighbor not in parents and neighbor not in candidates:
+                    candidates[neighbor] = current_node
+                    result.generated += 1
+                    if emit is not None:
+                        emit(PUSH, neighbor, current_node)
+                else:
+                    result.pruned += 1
+                    if emit is not None:
+                        emit(PRUNE, neighbor, current_node)
+
+            result.expansions += 1
+            result.update_queue_size(len(candidates))
+            result.visited.append(current_node)
+            yield current_node
+
+        layer = heapq.nsmallest(beam_width, candidates, key=lambda node: table[index(node)])
+        for node in layer:
+            parents[node] = candidates[node]
+        if emit is not None:
+            for node in candidates:
+                if node not in parents:
+                    emit(PRUNE, node, candidates[node])
+        result.pruned += len(candidates) - len(layer)
+        result.update_queue_size(len(layer))
+
+def branch_and_bound(graph, start, goal, result):
+    # Uniform-cost search over the edge weights. Improved costs are pushed as new
+    # heap entries and stale ones are skipped when popped (lazy deletion). The heap
+    # only holds node ids; the path is rebuilt from the parent pointers at the goal.
+    priority_queue = [(0, 0, start)]  # Priority queue with (cost, tie-breaker, node) tuples
+    best_costs = {start: 0}
+    parents = {start: None}
+    closed = set()
+    counter = 1  # Also the number of nodes generated
+    duplicates = pruned = 0
+    emit = result.emit
+    result.generated += 1
+
+    while priority_queue:
+        cost, _, current_node = heapq.heappop(priority_queue)
+        if current_node in closed:
+            continue  # Stale entry, the node was already reached more cheaply
+        closed.add(current_node)
+
+        if current_node == goal:
+            with result.phase('path'):
+                result.set_path(graph, reconstruct_path(parents, goal), cost)
+            return
+
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        for neighbor, weight in graph.edges(current_node):
+            new_cost = cost + weight
+            old_cost = best_costs.get(neighbor, math.inf)
+            if new_cost < old_cost and neighbor not in closed:
+                if old_cost != math.inf:
+                    duplicates += 1
+                best_costs[neighbor] = new_cost
+                parents[neighbor] = current_node
+                heapq.heappush(priority_queue, (new_cost, counter, neighbor))
+                counter += 1
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+            else:
+                pruned += 1
+                if emit is not None:
+                    emit(PRUNE, neighbor, current_node)
+
+        # Counted in locals inside the loop and copied over once per expansion
+        result.generated, result.duplicates, result.pruned = counter, duplicates, pruned
+        result.expansions += 1
+        result.update_queue_size(len(priority_queue))
+        result.visited.append(current_node)
+        yield current_node
+
+def a_star(graph, start, goal, result, heuristic='euclidean'):
+    # Same as branch_and_bound, ordered by f = g + h. The Euclidean heuristic is scaled
+    # by the graph's smallest weight/length ratio so that it never overestimates; the
+    # other heuristics are assumed to be in the same units as the edge weights.
+    with result.phase('heuristic'):
+        table = heuristic_table(graph, goal, heuristic)
+    index = graph.index
+    scale = graph.heuristic_scale if heuristic == 'euclidean' else 1.0
+    priority_queue = [(scale * table[index(start)], 0, 0, start)]  # (f-cost, tie-breaker, g-cost, node)
+    best_costs = {start: 0}
+    parents = {start: None}
+    closed = set()
+    counter = 1  # Also the number of nodes generated
+    duplicates = pruned = 0
+    emit = result.emit
+    result.generated += 1
+
+    while priority_queue:
+        _, _, g_cost, current_node = heapq.heappop(priority_queue)
+        if current_node in closed:
+            continue  # Stale entry, the node was already reached more cheaply
+        closed.add(current_node)
+
+        if current_node == goal:
+            with result.phase('path'):
+                result.set_path(graph, reconstruct_path(parents, goal), g_cost)
+            return
+
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        for neighbor, weight in graph.edges(current_node):
+            g_cost_new = g_cost + weight
+            old_cost = best_costs.get(neighbor, math.inf)
+            if g_cost_new < old_cost and neighbor not in closed:
+                if old_cost != math.inf:
+                    duplicates += 1
+                best_costs[neighbor] = g_cost_new
+                parents[neighbor] = current_node
+                f_cost = g_cost_new + scale * table[index(neighbor)]
+                heapq.heappush(priority_queue, (f_cost, counter, g_cost_new, neighbor))
+                counter += 1
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+            else:
+                pruned += 1
+                if emit is not None:
+                    emit(PRUNE, neighbor, current_node)
+
+        result.generated, result.duplicates, result.pruned = counter, duplicates, pruned
+        result.expansions += 1
+        result.update_queue_size(len(priority_queue))
+        result.visited.append(current_node)
+        yield current_node
+
+def join_paths(forward_parents, backward_parents, meeting_node):
+    # Path from the start to meeting_node, then along the backward search's parents to the goal
+    path = reconstruct_path(forward_parents, meeting_node)
+    node = backward_parents[meeting_node]
+    while node is not None:
+        path.append(node)
+        node = backward_parents[node]
+    return path
+
+def bidirectional_bfs(graph, start, goal, result):
+    # BFS from both ends, one whole layer at a time from whichever side has the smaller
+    # frontier. The first layer that touches the other side finishes, and the best
+    # meeting point found in it gives the path with the fewest edges.
+    if start == goal:
+        result.set_path(graph, [start])
+        return
+
+    frontiers = [[start], [goal]]
+    parents = [{start: None}, {goal: None}]
+    depths = [{start: 0}, {goal: 0}]
+    emit = result.emit
+    if emit is not None:
+        emit(PUSH, goal, None)
+    result.generated += 2
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_parents, own_depths, other_depths = parents[side], depths[side], depths[1 - side]
+        next_frontier = []
+        best_meeting, best_length = None, math.inf
+
+        for current_node in frontiers[side]:
+            frontier_size = len(next_frontier)
+            if emit is not None:
+                emit(EXPAND, current_node, None)
+            neighbors = graph.neighbors(current_node)
+            for neighbor in neighbors:
+                if neighbor not in own_parents:
+                    own_parents[neighbor] = current_node
+                    own_depths[neighbor] = own_depths[current_node] + 1
+                    next_frontier.append(neighbor)
+                    if emit is not None:
+                        emit(PUSH, neighbor, current_node)
+                    if neighbor in other_depths:
+                        length = own_depths[neighbor] + other_depths[neighbor]
+                        if length < best_length:
+                            best_meeting, best_length = neighbor, length
+                elif emit is not None:
+                    emit(PRUNE, neighbor, current_node)
+
+            added = len(next_frontier) - frontier_size
+            result.generated += added
+            result.pruned += len(neighbors) - added
+            result.expansions += 1
+            result.update_queue_size(len(next_frontier) + len(frontiers[1 - side]))
+            result.visited.append(current_node)
+            yield current_node
+
+        if best_meeting is not None:
+            with result.phase('path'):
+                result.set_path(graph, join_paths(parents[0], parents[1], best_meeting))
+            return
+        frontiers[side] = next_frontier
+
+def bidirectional_a_star(graph, start, goal, result, heuristic='euclidean'):
+    # A* forwards from the start and backwards from the goal, always advancing the side
+    # with the smaller heap. Both sides use the average potential
+    # p(v) = (h_goal(v) - h_start(v)) / 2 (negated for the backward side), which keeps
+    # both sides consistent, and the potentials cancel when a forward and a backward key
+    # are added up. best_cost is the cheapest start-goal path seen where the two searches
+    # meet, and the search stops once the two smallest keys add up to best_cost: no
+    # cheaper meeting is possible after that (the bidirectional Dijkstra stopping rule).
+    if start == goal:
+        result.set_path(graph, [start])
+        return
+
+    index = graph.index
+    scale = graph.heuristic_scale if heuristic == 'euclidean' else 1.0
+    with result.phase('heuristic'):
+        to_goal, to_start = heuristic_table(graph, goal, heuristic), heuristic_table(graph, start, heuristic)
+
+    def potential(node):
+        node_index = index(node)
+        return scale * (to_goal[node_index] - to_start[node_index]) / 2
+
+    signs = (1, -1)  # Forward keys add the potential, backward keys subtract it
+    heaps = [[(potential(start), 0, 0, start)], [(-potential(goal), 1, 0, goal)]]
+    costs = [{start: 0}, {goal: 0}]
+    parents = [{start: None}, {goal: None}]
+    closed = [set(), set()]
+    counter = 2  # Also the number of nodes generated
+    duplicates = pruned = 0
+    best_cost, meeting_node = math.inf, None
+    emit = result.emit
+    if emit is not None:
+        emit(PUSH, goal, None)
+    result.generated += 2
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best_cost:
+            break
+
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, sign = heaps[side], signs[side]
+        own_costs, other_costs = costs[side], costs[1 - side]
+
+        _, _, g_cost, current_node = heapq.heappop(heap)
+        if current_node in closed[side]:
+            continue  # Stale entry, the node was already reached more cheaply
+        closed[side].add(current_node)
+
+        if emit is not None:
+            emit(EXPAND, current_node, None)
+        for neighbor, weight in graph.edges(current_node):
+            g_cost_new = g_cost + weight
+            old_cost = own_costs.get(neighbor, math.inf)
+            if g_cost_new < old_cost and neighbor not in closed[side]:
+                if old_cost != math.inf:
+                    duplicates += 1
+                own_costs[neighbor] = g_cost_new
+                parents[side][neighbor] = current_node
+                heapq.heappush(heap, (g_cost_new + sign * potential(neighbor), counter, g_cost_new, neighbor))
+                counter += 1
+                if emit is not None:
+                    emit(PUSH, neighbor, current_node)
+                if neighbor in other_costs and g_cost_new + other_costs[neighbor] < best_cost:
+                    best_cost, meeting_node = g_cost_new + other_costs[neighbor], neighbor
+            else:
+                pruned += 1
+                if emit is not None:
+                    emit(PRUNE, neighbor, current_node)
+
+        result.generated, result.duplicates, result.pruned = counter, duplicates, pruned
+        result.expansions += 1
+        result.update_queue_size(len(heaps[0]) + len(heaps[1]))
+        result.visited.append(current_node)
+        yield current_node
+
+    if meeting_node is not None:
+        with result.phase('path'):
+            result.set_path(graph, join_paths(parents[0], parents[1], meeting_node), best_cost)
+
+ALGORITHMS = {
+    'bfs': bfs,
+    'dfs': dfs,
+    'depth_limited_dfs': depth_limited_dfs,
+    'iterative_deepening_dfs': iterative_deepening_dfs,
+    'hill_climbing': hill_climbing,
+    'beam_search': beam_search,
+    'branch_and_bound': branch_and_bound,
+    'a_star': a_star,
+    'bidirectional_bfs': bidirectional_bfs,
+    'bidirectional_a_star': bidirectional_a_star,
+}
+
+def _record_total(result, elapsed):
+    timings = result.timings
+    timings['total'] = elapsed
+    timings['search'] = elapsed - timings.get('heuristic', 0.0) - timings.get('path', 0.0)
+
+def _instrumented(steps, result, callback):
+    # Times the work done inside the search generator, leaving out whatever the caller
+    # does between steps, and calls callback(result, node) after every expansion.
+    clock = time.perf_counter
+    elapsed = 0.0
+    try:
+        while True:
+            started = clock()
+            try:
+                node = next(steps)
+            except StopIteration:
+                elapsed += clock() - started
+                return
+            elapsed += clock() - started
+            if callback is not None:
+                callback(result, node)
+            yield node
+    finally:
+        steps.close()
+        _record_total(result, elapsed)
+
+def _steps(graph, start, goal, algorithm, result, emit, options):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}")
+    if start not in graph or goal not in graph:
+        raise ValueError("Start and goal nodes must be in the graph")
+    result.emit = emit
+    if emit is not None:
+        emit(PUSH, start, None)
+    return ALGORITHMS[algorithm](graph, start, goal, result, **options)
+
+def iter_search(graph, start, goal, algorithm, result, callback=None, emit=None, **options):
+    # callback(result, node), if given, runs after every expansion with the live result,
+    # e.g. to sample the counters or log progress. emit(event, node, parent) receives
+    # the step events described at the top of this module.
+    return _instrumented(_steps(graph, start, goal, algorithm, result, emit, options), result, callback)
+
+def search(graph, start, goal, algorithm='a_star', callback=None, emit=None, **options):
+    result = SearchResult(algorithm)
+    if callback is not None:
+        deque(iter_search(graph, start, goal, algorithm, result, callback, emit, **options), maxlen=0)
+        return result
+
+    # Nothing happens between steps here, so the run is timed as a whole instead of per step
+    steps = _steps(graph, start, goal, algorithm, result, emit, options)
+    started = time.perf_counter()
+    deque(steps, maxlen=0)  # Run to completion
+    _record_total(result, time.perf_counter() - started)
+    return result
+
+class ResultCache:
+    # LRU cache of finished SearchResults keyed by (start, goal, algorithm, options),
+    # for answering repeated queries against an unchanged graph. Every edit bumps
+    # graph.version, and a lookup against a different graph or version empties the
+    # cache first, so a stale result is never returned. get() and put() take any value,
+    # so callers that only need a summary of each result can cache that instead.
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.graph = None
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.results)
+
+    def clear(self):
+        self.results.clear()
+
+    def _sync(self, graph):
+        if graph is not self.graph or graph.version != self.version:
+            self.results.clear()
+            self.graph, self.version = graph, graph.version
+
+    @staticmethod
+    def _key(start, goal, algorithm, options):
+        return (start, goal, algorithm, tuple(sorted(options.items())))
+
+    def get(self, graph, start, goal, algorithm, **options):
+        self._sync(graph)
+        key = self._key(start, goal, algorithm, options)
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def put(self, graph, start, goal, algorithm, result, **options):
+        self._sync(graph)
+        self.results[self._key(start, goal, algorithm, options)] = result
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+
+    def search(self, graph, start, goal, algorithm='a_star', **options):
+        result = self.get(graph, start, goal, algorithm, **options)
+        if result is None:
+            result = search(graph, start, goal, algorithm, **options)
+            self.put(graph, start, goal, algorithm, result, **options)
+        return result
+
+class IncrementalAStar:
+    # Lifelong Planning A* (LPA*) between a fixed start and goal. Unlike a_star it keeps
+    # its search state between runs: after the graph changes, update() is told which
+    # nodes gained or lost edges, and the next run only repairs the part of the search
+    # those changes affect. A road closure near the path typically re-expands a small
+    # fraction of the nodes a fresh A* run would.
+    #
+    # For every node it keeps costs (g, the cost of the best path settled so far) and
+    # lookahead (rhs, the best cost through any neighbour's settled cost). A node whose
+    # two values differ is queued by (min(g, rhs) + h, min(g, rhs)); a run settles queued
+    # nodes in that order until the goal is settled and nothing queued could beat it.
+    #
+    # The heuristic table is captured when the search starts and kept across edits, so
+    # it must stay consistent. Deleting edges never breaks that. When an added edge
+    # would (e.g. a new edge cheaper per unit of length than any before), or the graph
+    # changed without update() being called, the next run starts over from scratch.
+    def __init__(self, graph, start, goal, heuristic='euclidean'):
+        if heuristic not in HEURISTICS and heuristic != 'alt':
+            raise ValueError(f"Unknown heuristic: {heuristic!r}")
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.heuristic = heuristic
+        self.needs_reset = True  # The state is built by the first run
+        self.resets = 0
+
+    def reset(self):
+        # Throws the search state away; the next run starts from scratch
+        self.needs_reset = True
+
+    def _reset(self):
+        graph = self.graph
+        self.table = heuristic_table(graph, self.goal, self.heuristic)
+        self.scale = graph.heuristic_scale if self.heuristic == 'euclidean' else 1.0
+        self.costs = {}
+        self.lookahead = {self.start: 0}
+        self.parents = {self.start: None}  # node -> the neighbour its lookahead comes through
+        self.queue = []  # (key, tie-breaker, node); entries whose key is not queued[node] are stale
+        self.queued = {}  # node -> its current key
+        self.pushes = self.duplicates = self.pruned = 0
+        self.reported = (0, 0, 0)  # pushes, duplicates and pruned already counted by earlier runs
+        self.emit = None
+        self.version = graph.version
+        self.needs_reset = False
+        self.resets += 1
+        self._enqueue(self.start)
+
+    def _h(self, node):
+        index = self.graph.index(node)
+        if index >= len(self.table):
+            # Nodes added since the search started. The coordinate heuristics are cheap to
+            # recompute; landmark distances are not, so new nodes get 0 (still admissible).
+            if self.heuristic in HEURISTICS:
+                extra = heuristic_table(self.graph, self.goal, self.heuristic)[len(self.table):]
+            else:
+                extra = [0.0] * (len(self.graph.xs) - len(self.table))
+            self.table = list(self.table) + list(extra)  # The cached table itself is shared
+        return self.scale * self.table[index]
+
+    def _enqueue(self, node):
+        # Queues node under its current key if its two costs differ, otherwise unqueues it.
+        # Returns whether anything was pushed.
+        cost = self.costs.get(node, math.inf)
+        lookahead = self.lookahead.get(node, math.inf)
+        if cost == lookahead:
+            self.queued.pop(node, None)
+            return False
+        cost = min(cost, lookahead)
+        key = (cost + self._h(node), cost)
+        old_key = self.queued.get(node)
+        if old_key == key:
+            return False
+        if old_key is not None:
+            self.duplicates += 1
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key, self.pushes, node))
+        self.pushes += 1
+        return True
+
+    def _recompute(self, node):
+        # Recomputes the lookahead of node from all of its neighbours
+        if node != self.start:
+            best_cost, parent = math.inf, None
+            costs = self.costs
+            for neighbor, weight in self.graph.edges(node):
+                cost = costs.get(neighbor, math.inf) + weight
+                if cost < best_cost:
+                    best_cost, parent = cost, neighbor
+            if parent is None:
+                self.lookahead.pop(node, None)
+                self.parents.pop(node, None)
+            else:
+                self.lookahead[node] = best_cost
+                self.parents[node] = parent
+        return self._enqueue(node)
+
+    def update(self, nodes):
+        # Call after every change to the graph with the nodes whose edges changed: both
+        # ends of each added or removed connection, and removed nodes together with their
+        # former neighbours. Added nodes without connections need not be listed.
+        graph = self.graph
+        if self.needs_reset:
+            return
+        if graph.version == self.version:
+            return  # Nothing changed
+        nodes = list(dict.fromkeys(nodes))
+
+        for node in nodes:
+            if node not in graph:
+                if node == self.start or node == self.goal:
+                    self.needs_reset = True  # The next run reports the missing node
+                    return
+                for state in (self.costs, self.lookahead, self.parents, self.queued):
+                    state.pop(node, None)
+
+        # A new edge can make the captured heuristic overestimate; that needs a fresh start
+        for node in nodes:
+            if node in graph:
+                h = self._h(node)
+                for neighbor, weight in graph.edges(node):
+                    if h > weight + self._h(neighbor) + 1e-9:
+                        self.needs_reset = True
+                        return
+
+        for node in nodes:
+            if node in graph:
+                self._recompute(node)
+        self.version = graph.version
+
+    def _steps(self, result):
+        graph, start, goal = self.graph, self.start, self.goal
+        if start not in graph or goal not in graph:
+            raise ValueError("Start and goal nodes must be in the graph")
+        if not self.needs_reset and graph.version != self.version:
+            self.needs_reset = True  # The graph changed without update() being told how
+        if self.needs_reset:
+            with result.phase('heuristic'):
+                self._reset()
+
+        emit = self.emit = result.emit
+        if emit is not None:
+            for node in self.queued:
+                emit(PUSH, node, self.parents.get(node))
+        costs, lookahead, parents, queued, queue = self.costs, self.lookahead, self.parents, self.queued, self.queue
+        goal_h = self._h(goal)
+        # Counts carried over from an earlier attempt of this run, then the planner's
+        # totals at the start of this one
+        base = (result.generated, result.duplicates, result.pruned)
+        pushes, duplicates, pruned = (total - count for total, count in zip(self.reported, base))
+
+        try:
+            while queue:
+                key, _, current_node = queue[0]
+                if queued.get(current_node) != key:
+                    heapq.heappop(queue)  # Stale entry
+                    continue
+                goal_cost = costs.get(goal, math.inf)
+                if goal_cost == lookahead.get(goal, math.inf) and key >= (goal_cost + goal_h, goal_cost):
+                    break  # The goal is settled and nothing queued can improve on it
+                heapq.heappop(queue)
+                del queued[current_node]
+
+                if emit is not None:
+                    emit(EXPAND, current_node, None)
+                cost = lookahead.get(current_node, math.inf)
+                if costs.get(current_node, math.inf) > cost:
+                    # Cheaper than before: settle it and pass the cost on, as A* would
+                    costs[current_node] = cost
+                    for neighbor, weight in graph.edges(current_node):
+                        if neighbor != start and cost + weight < lookahead.get(neighbor, math.inf):
+                            lookahead[neighbor] = cost + weight
+                            parents[neighbor] = current_node
+                            if self._enqueue(neighbor):
+                                if emit is not None:
+                                    emit(PUSH, neighbor, current_node)
+                                continue
+                        # Not cheaper, or cheaper but only back to its settled cost
+                        self.pruned += 1
+                        if emit is not None:
+                            emit(PRUNE, neighbor, current_node)
+                else:
+                    # Dearer than before (an edge on its path went away): unsettle it and
+                    # every neighbour whose lookahead came through it
+                    del costs[current_node]
+                    if self._recompute(current_node) and emit is not None:
+                        emit(PUSH, current_node, parents.get(current_node))
+                    for neighbor, _ in graph.edges(current_node):
+                        if parents.get(neighbor) == current_node:
+                            if self._recompute(neighbor) and emit is not None:
+                                emit(PUSH, neighbor, parents.get(neighbor))
+
+                result.generated = self.pushes - pushes
+                result.duplicates = self.duplicates - duplicates
+                result.pruned = self.pruned - pruned
+                result.expansions += 1
+                result.update_queue_size(len(queued))
+                result.visited.append(current_node)
+                yield current_node
+        finally:
+            self.emit = None
+            self.reported = (self.pushes, self.duplicates, self.pruned)
+            result.generated = self.pushes - pushes
+            result.duplicates = self.duplicates - duplicates
+            result.pruned = self.pruned - pruned
+
+        if costs.get(goal, math.inf) != math.inf:
+            with result.phase('path'):
+                path = self._path()
+            if path is None:
+                # LPA* assumes positive weights. Nodes joined by zero-weight edges can end
+                # up vouching for each other's stale cost, which shows up here as parents
+                # that loop or a path dearer than its cost. A fresh search cannot do that.
+                self.needs_reset = True
+                yield from self._steps(result)
+                return
+            with result.phase('path'):
+                result.set_path(graph, path, path_cost(graph, path))
+
+    def _path(self):
+        # Follows the parents back from the goal; None if they do not lead to the start
+        # along a path of the cost the search found
+        start, goal, parents = self.start, self.goal, self.parents
+        path = [goal]
+        seen = {goal}
+        while path[-1] != start:
+            node = parents.get(path[-1])
+            if node is None or node in seen:
+                return None
+            path.append(node)
+            seen.add(node)
+        path.reverse()
+        cost = self.costs[goal]
+        if path_cost(self.graph, path) > cost + 1e-9 * (1 + cost):
+            return None
+        return path
+
+    def iter_search(self, result, callback=None, emit=None):
+        # Runs (or repairs) the search one expansion at a time, like iter_search()
+        result.emit = emit
+        return _instrumented(self._steps(result), result, callback)
+
+    def search(self, callback=None, emit=None):
+        result = SearchResult('incremental_a_star')
+        deque(self.iter_search(result, callback, emit), maxlen=0)
+        return result
@@ -0,0 +1,233 @@
+import argparse
+import json
+import struct
+from array import array
+
+from search_engine import EXPAND, PUSH, PRUNE, GOAL, search
+
+# Search traces: the step events of one run (see search_engine), written while the
+# search runs so huge searches can be recorded headlessly and replayed later in the
+# GraphEditor. Nodes are stored as graph.index(node), and -1 stands for no parent, so
+# a trace replays against the same graph (or the same graph saved and loaded again).
+#
+# JSONL (.jsonl): a header object on the first line, then one [event, node, parent]
+# array per line.
+#
+# Binary (any other extension, e.g. .trace): magic, uint32 header length, the header
+# as UTF-8 JSON, then one 9-byte little-endian record per event: uint8 event code,
+# int32 node, int32 parent.
+
+TRACE_MAGIC = b'PSATRC01'
+TRACE_RECORD = struct.Struct('<Bii')
+EVENTS = [EXPAND, PUSH, PRUNE, GOAL]  # Binary event codes are positions in this list
+EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+FLUSH_BYTES = 1 << 16
+
+class TraceWriter:
+    # Writes events incrementally; pass writer.emit as the emit hook of a search
+    def __init__(self, path, graph, start, goal, algorithm, **options):
+        self.path = path
+        self.index = graph.index
+        self.binary = not str(path).endswith('.jsonl')
+        self.count = 0
+        header = {
+            'algorithm': algorithm,
+            'options': options,
+            'start': graph.index(start),
+            'goal': graph.index(goal),
+            'start_label': graph.label(start),
+            'goal_label': graph.label(goal),
+            'node_count': len(graph.xs),  # Size of the node index space
+        }
+
+        if self.binary:
+            self.file = open(path, 'wb')
+            encoded = json.dumps(header).encode('utf-8')
+            self.file.write(TRACE_MAGIC + struct.pack('<I', len(encoded)) + encoded)
+            self.buffer = bytearray()
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            self.file.write(json.dumps(header) + '\n')
+
+    def emit(self, event, node, parent):
+        node = self.index(node)
+        parent = -1 if parent is None else self.index(parent)
+        self.count += 1
+        if self.binary:
+            self.buffer += TRACE_RECORD.pack(EVENT_CODES[event], node, parent)
+            if len(self.buffer) >= FLUSH_BYTES:
+                self.file.write(self.buffer)
+                self.buffer.clear()
+        else:
+            self.file.write(f'["{event}",{node},{parent}]\n')
+
+    def close(self):
+        if self.file is not None:
+            if self.binary:
+                self.file.write(self.buffer)
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def record_search(graph, start, goal, path, algorithm='a_star', **options):
+    # Runs a search at full speed, writing its trace to path, and returns the SearchResult
+    with TraceWriter(path, graph, start, goal, algorithm, **options) as writer:
+        return search(graph, start, goal, algorithm, emit=writer.emit, **options)
+
+def _read_header(file, path):
+    magic = file.read(len(TRACE_MAGIC))
+    if magic == TRACE_MAGIC:
+        (size,) = struct.unpack('<I', file.read(4))
+        return json.loads(file.read(size).decode('utf-8')), True
+    file.seek(0)
+    try:
+        return json.loads(file.readline().decode('utf-8')), False
+    except ValueError:
+        raise ValueError(f"{path} is not a search trace") from None
+
+def iter_trace(path):
+    # Streams (event, node, parent) tuples without loading the whole trace. The header
+    # is yielded first.
+    with open(path, 'rb') as file:
+        header, binary = _read_header(file, path)
+        yield header
+        if binary:
+            while True:
+                chunk = file.read(TRACE_RECORD.size * 8192)
+                usable = len(chunk) - len(chunk) % TRACE_RECORD.size
+                for code, node, parent in TRACE_RECORD.iter_unpack(chunk[:usable]):
+                    yield EVENTS[code], node, parent
+                if len(chunk) < TRACE_RECORD.size * 8192:
+                    break  # A torn last record (e.g. from a crashed recording) is ignored
+        else:
+            for line in file:
+                if line.strip():
+                    event, node, parent = json.loads(line)
+                    yield event, node, parent
+
+class Trace:
+    # A whole trace in memory as three compact columns
+    def __init__(self, header, codes, nodes, parents):
+        self.header = header
+        self.codes = codes  # array('B') of event codes
+        self.nodes = nodes  # array('i')
+        self.parents = parents  # array('i'), -1 for no parent
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, position):
+        return EVENTS[self.codes[position]], self.nodes[position], self.parents[position]
+
+def load_trace(path):
+    events = iter_trace(path)
+    header = next(events)
+    codes, nodes, parents = array('B'), array('i'), array('i')
+    for event, node, parent in events:
+        codes.append(EVENT_CODES[event])
+        nodes.append(node)
+        parents.append(parent)
+    return Trace(header, codes, nodes, parents)
+
+# Node colors while replaying, as indices into REPLAY_COLORS
+UNCOLORED, START, GOAL_NODE, FRONTIER, EXPANDED, ON_PATH = range(6)
+REPLAY_COLORS = [None, 'green', 'red', 'light blue', 'blue', 'orange']
+
+class TracePlayer:
+    # Moves through a Trace one event at a time, forwards or backwards, keeping track of
+    # each node's color and the event counts so far. Each applied event remembers the
+    # color it replaced, so scrubbing from one position to another only touches the
+    # events in between.
+    def __init__(self, trace):
+        self.trace = trace
+        self.position = 0  # Number of events applied
+        self.colors = {trace.header['start']: START, trace.header['goal']: GOAL_NODE}
+        self.replaced = bytearray(len(trace))  # Color each applied event replaced
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self.expanded = []  # Node indices in expansion order
+        self.path = []  # Node indices of the path, once GOAL events have been applied
+
+    def __len__(self):
+        return len(self.trace)
+
+    @property
+    def done(self):
+        return self.position == len(self.trace)
+
+    def color(self, node):
+        return REPLAY_COLORS[self.colors.get(node, UNCOLORED)]
+
+    def step(self):
+        # Applies the next event and returns the node it was about, or None at the end
+        if self.done:
+            return None
+        event, node, _ = self.trace[self.position]
+        old = self.colors.get(node, UNCOLORED)
+        new = old
+        if event == EXPAND:
+            new = EXPANDED
+            self.expanded.append(node)
+        elif event == PUSH:
+            if old == UNCOLORED:
+                new = FRONTIER
+        elif event == GOAL:
+            new = ON_PATH
+            self.path.append(node)
+        self.replaced[self.position] = old
+        self.colors[node] = new
+        self.counts[event] += 1
+        self.position += 1
+        return node
+
+    def back(self):
+        # Undoes the last applied event and returns its node, or None at the start
+        if self.position == 0:
+            return None
+        self.position -= 1
+        event, node, _ = self.trace[self.position]
+        if event == EXPAND:
+            self.expanded.pop()
+        elif event == GOAL:
+            self.path.pop()
+        self.colors[node] = self.replaced[self.position]
+        self.counts[event] -= 1
+        return node
+
+    def seek(self, position):
+        # Moves to position and returns the set of nodes whose color may have changed
+        position = max(0, min(position, len(self.trace)))
+        changed = set()
+        while self.position < position:
+            changed.add(self.step())
+        while self.position > position:
+            changed.add(self.back())
+        return changed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record a search trace headlessly for later replay.")
+    parser.add_argument('graph', help="graph file (edge list or binary CSR)")
+    parser.add_argument('start', help="start node label")
+    parser.add_argument('goal', help="goal node label")
+    parser.add_argument('output', help="trace file to write (.jsonl for text, anything else for binary)")
+    parser.add_argument('--algorithm', default='a_star', help="search algorithm (default: a_star)")
+    parser.add_argument('--heuristic', help="heuristic for the informed searches")
+    args = parser.parse_args(argv)
+
+    from graph_io import load_graph
+    graph = load_graph(args.graph)
+    nodes_by_label = {graph.label(node): node for node in graph}
+    if args.start not in nodes_by_label or args.goal not in nodes_by_label:
+        parser.error("start and goal must be node labels in the graph")
+
+    options = {'heuristic': args.heuristic} if args.heuristic else {}
+    result = record_search(graph, nodes_by_label[args.start], nodes_by_label[args.goal], args.output,
+                           args.algorithm, **options)
+    print(json.dumps(result.metrics(graph)))
+
+if __name__ == "__main__":
+    main()
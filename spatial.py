@@ -0,0 +1,160 @@
+class GridIndex:
+    # Uniform-grid spatial index over points. Each cell is a dict item -> (x, y),
+    # so inserts and removals are O(1) and a query only looks at the cells that
+    # overlap the query rectangle.
+    def __init__(self, cell_size=40):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item, x, y):
+        self.cells.setdefault(self._cell(x, y), {})[item] = (x, y)
+        self.count += 1
+
+    def remove(self, item, x, y):
+        key = self._cell(x, y)
+        cell = self.cells[key]
+        del cell[item]
+        if not cell:
+            del self.cells[key]
+        self.count -= 1
+
+    def clear(self):
+        self.cells = {}
+        self.count = 0
+
+    def query(self, x0, y0, x1, y1):
+        # Yields (item, x, y) for every point inside the rectangle
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # A huge rectangle (e.g. zoomed far out) covers mostly empty cells,
+            # so walking the occupied cells is cheaper
+            keys = [key for key in self.cells if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1]
+        else:
+            keys = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1) if (cx, cy) in self.cells]
+
+        for key in keys:
+            for item, (x, y) in self.cells[key].items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield item, x, y
+
+    def nearest(self, x, y, radius):
+        # The closest item within radius along both axes, or None
+        best, best_distance = None, None
+        for item, item_x, item_y in self.query(x - radius, y - radius, x + radius, y + radius):
+            distance = (item_x - x) ** 2 + (item_y - y) ** 2
+            if best_distance is None or distance < best_distance:
+                best, best_distance = item, distance
+        return best
+
+def segment_crosses_rect(ax, ay, bx, by, left, top, right, bottom):
+    # Liang-Barsky clipping: narrows the segment's parameter range [0, 1] against each
+    # side of the rectangle, and the segment misses it if the range becomes empty
+    low, high = 0.0, 1.0
+    dx, dy = bx - ax, by - ay
+    for p, q in ((-dx, ax - left), (dx, right - ax), (-dy, ay - top), (dy, bottom - ay)):
+        if p == 0:
+            if q < 0:
+                return False  # Parallel to this side and outside it
+        elif p < 0:
+            low = max(low, q / p)
+        else:
+            high = min(high, q / p)
+        if low > high:
+            return False
+    return True
+
+class SegmentIndex:
+    # Uniform-grid index over line segments, for finding every segment that crosses a
+    # rectangle even when both of its ends are outside it. A segment is listed in each
+    # cell its bounding box overlaps; one whose box would cover more than max_cells
+    # cells is kept in a separate set that every query checks, so a few very long
+    # segments do not fill thousands of cells.
+    def __init__(self, cell_size=160, max_cells=64):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.cells = {}
+        self.segments = {}  # item -> (x1, y1, x2, y2)
+        self.long_segments = {}  # Used as an ordered set
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __contains__(self, item):
+        return item in self.segments
+
+    def _cell_range(self, x1, y1, x2, y2):
+        size = self.cell_size
+        return (int(min(x1, x2) // size), int(min(y1, y2) // size),
+                int(max(x1, x2) // size), int(max(y1, y2) // size))
+
+    def _keys(self, segment):
+        cx0, cy0, cx1, cy1 = self._cell_range(*segment)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.max_cells:
+            return None
+        return [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+
+    def insert(self, item, x1, y1, x2, y2):
+        # Inlined cell arithmetic: this runs for every connection when a graph is loaded
+        self.segments[item] = (x1, y1, x2, y2)
+        size = self.cell_size
+        cx0, cx1 = int(x1 // size), int(x2 // size)
+        cy0, cy1 = int(y1 // size), int(y2 // size)
+        if cx0 > cx1:
+            cx0, cx1 = cx1, cx0
+        if cy0 > cy1:
+            cy0, cy1 = cy1, cy0
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.max_cells:
+            self.long_segments[item] = None
+            return
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[cx, cy] = {item: None}
+                else:
+                    cell[item] = None
+
+    def remove(self, item):
+        keys = self._keys(self.segments.pop(item))
+        if keys is None:
+            del self.long_segments[item]
+            return
+        for key in keys:
+            cell = self.cells[key]
+            del cell[item]
+            if not cell:
+                del self.cells[key]
+
+    def clear(self):
+        self.cells = {}
+        self.segments = {}
+        self.long_segments = {}
+
+    def query(self, x0, y0, x1, y1):
+        # Yields every item whose segment crosses or touches the rectangle, once
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            keys = [key for key in self.cells if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1]
+        else:
+            keys = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1) if (cx, cy) in self.cells]
+
+        seen = set()
+        for key in keys:
+            for item in self.cells[key]:
+                if item not in seen:
+                    seen.add(item)
+                    if segment_crosses_rect(*self.segments[item], x0, y0, x1, y1):
+                        yield item
+        for item in self.long_segments:
+            if segment_crosses_rect(*self.segments[item], x0, y0, x1, y1):
+                yield item
@@ -0,0 +1,53 @@
+import heapq
+import math
+import random
+from collections import deque
+
+from graph import Graph
+
+# Plain reference searches and random test graphs, shared by the algorithm tests
+
+def dijkstra(graph, start):
+    # Cheapest path cost from start to every reachable node
+    distances = {start: 0.0}
+    queue = [(0.0, start)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        for neighbor, weight in graph.edges(node):
+            if distance + weight < distances.get(neighbor, math.inf):
+                distances[neighbor] = distance + weight
+                heapq.heappush(queue, (distance + weight, neighbor))
+    return distances
+
+def hops(graph, start):
+    # Fewest edges from start to every reachable node
+    depths = {start: 0}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph.neighbors(node):
+            if neighbor not in depths:
+                depths[neighbor] = depths[node] + 1
+                queue.append(neighbor)
+    return depths
+
+def random_graph(seed, node_count=40, edge_count=70):
+    # Random points joined by random edges, weighted or not, with parallel edges and
+    # usually more than one component
+    rng = random.Random(seed)
+    graph = Graph()
+    nodes = graph.add_nodes((f"n{index}", rng.uniform(0, 100), rng.uniform(0, 100)) for index in range(node_count))
+    weighted = rng.random() < 0.7
+    connections = []
+    for _ in range(edge_count):
+        node1, node2 = rng.sample(nodes, 2)
+        connections.append((node1, node2, str(rng.randint(1, 60)) if weighted else 'road'))
+    graph.add_connections(connections)
+    return graph
+
+def check_path(graph, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for node, neighbor in zip(path, path[1:]):
+        assert neighbor in graph.neighbors(node)
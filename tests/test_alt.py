@@ -0,0 +1,51 @@
+import math
+import random
+
+import pytest
+
+import generators
+from heuristics import heuristic_table
+from reference import dijkstra, random_graph
+from search_engine import search
+
+def check_admissible(graph, goal):
+    table = heuristic_table(graph, goal, 'alt')
+    for node, distance in dijkstra(graph, goal).items():
+        assert table[graph.index(node)] <= distance + 1e-9
+
+@pytest.mark.parametrize('graph', [random_graph(seed) for seed in range(8)] + [generators.random_geometric(80, seed=5)])
+def test_alt_never_overestimates(graph):
+    rng = random.Random(3)
+    for goal in rng.sample(list(graph), 10):
+        check_admissible(graph, goal)
+
+@pytest.mark.parametrize('seed', range(8))
+def test_a_star_with_alt_finds_cheapest_path(seed):
+    graph = random_graph(seed)
+    rng = random.Random(seed)
+    for _ in range(15):
+        start, goal = rng.sample(list(graph), 2)
+        expected = dijkstra(graph, start).get(goal)
+        result = search(graph, start, goal, 'a_star', heuristic='alt')
+        assert result.found == (expected is not None)
+        if expected is not None:
+            assert math.isclose(result.path_cost, expected)
+
+@pytest.mark.parametrize('seed', range(8))
+def test_alt_follows_graph_edits(seed):
+    # Cheap shortcuts make the old landmark distances too large, so a stale table would overestimate
+    graph = random_graph(seed)
+    rng = random.Random(seed)
+    goal = rng.choice(list(graph))
+    check_admissible(graph, goal)
+    for _ in range(5):
+        graph.remove_connections(rng.sample(list(graph.connections()), 3))
+        node1, node2 = rng.sample(list(graph), 2)
+        graph.add_connection(node1, node2, '0.5')
+        check_admissible(graph, goal)
+        start = rng.choice(list(graph))
+        expected = dijkstra(graph, start).get(goal)
+        result = search(graph, start, goal, 'a_star', heuristic='alt')
+        assert result.found == (expected is not None)
+        if expected is not None:
+            assert math.isclose(result.path_cost, expected)
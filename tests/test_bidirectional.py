@@ -0,0 +1,38 @@
+import math
+import random
+
+import pytest
+
+import generators
+from reference import check_path, dijkstra, hops, random_graph
+from search_engine import search
+
+GRAPHS = [random_graph(seed) for seed in range(12)] + [generators.grid(49, seed=1), generators.scale_free(60, seed=2)]
+
+def queries(graph, seed, count=15):
+    rng = random.Random(seed)
+    nodes = list(graph)
+    return [tuple(rng.sample(nodes, 2)) for _ in range(count)] + [(nodes[0], nodes[0])]
+
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_bidirectional_bfs_finds_fewest_edges(graph):
+    for start, goal in queries(graph, 1):
+        expected = hops(graph, start).get(goal)
+        result = search(graph, start, goal, 'bidirectional_bfs')
+        if expected is None:
+            assert not result.found
+        else:
+            assert result.found and result.path_length == expected
+            check_path(graph, result.path, start, goal)
+
+@pytest.mark.parametrize('heuristic', ['euclidean', 'zero', 'alt'])
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_bidirectional_a_star_finds_cheapest_path(graph, heuristic):
+    for start, goal in queries(graph, 2):
+        expected = dijkstra(graph, start).get(goal)
+        result = search(graph, start, goal, 'bidirectional_a_star', heuristic=heuristic)
+        if expected is None:
+            assert not result.found
+        else:
+            assert result.found and math.isclose(result.path_cost, expected)
+            check_path(graph, result.path, start, goal)
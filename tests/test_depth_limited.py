@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+import generators
+from reference import check_path, hops, random_graph
+from search_engine import search
+
+GRAPHS = [random_graph(seed) for seed in range(10)] + [generators.grid(36, seed=1)]
+
+def queries(graph, seed, count=12):
+    rng = random.Random(seed)
+    return [tuple(rng.sample(list(graph), 2)) for _ in range(count)]
+
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_depth_limited_dfs_finds_goal_within_limit(graph):
+    # A path of at most depth_limit edges is found exactly when one exists
+    for start, goal in queries(graph, 1):
+        distance = hops(graph, start).get(goal)
+        for depth_limit in range(0, 8):
+            result = search(graph, start, goal, 'depth_limited_dfs', depth_limit=depth_limit)
+            assert result.found == (distance is not None and distance <= depth_limit)
+            if result.found:
+                assert result.path_length <= depth_limit
+                check_path(graph, result.path, start, goal)
+
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_iterative_deepening_finds_fewest_edges(graph):
+    for start, goal in queries(graph, 2):
+        distance = hops(graph, start).get(goal)
+        result = search(graph, start, goal, 'iterative_deepening_dfs')
+        assert result.found == (distance is not None)
+        if result.found:
+            assert result.path_length == distance
+            check_path(graph, result.path, start, goal)
+
+        if distance:
+            capped = search(graph, start, goal, 'iterative_deepening_dfs', max_depth=distance - 1)
+            assert not capped.found
+
+def test_depth_limits_must_not_be_negative():
+    graph = random_graph(0)
+    with pytest.raises(ValueError):
+        search(graph, 0, 1, 'depth_limited_dfs', depth_limit=-1)
+    with pytest.raises(ValueError):
+        search(graph, 0, 1, 'iterative_deepening_dfs', max_depth=-1)
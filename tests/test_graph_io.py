@@ -0,0 +1,69 @@
+import pytest
+
+import generators
+import graph_io
+from graph import Graph
+
+def make_graph():
+    graph = Graph()
+    a, b, c, d = graph.add_nodes([('A', 0.0, 0.0), ('B', 1.5, -2.25), ('node C', 1e-3, 12345.678), ('D', 3.0, 4.0)])
+    graph.add_connections([(a, b, '2.5'), (b, c, 'bridge'), (a, c, '7'), (a, b, '4'), (c, d, '0.1')])
+    graph.remove_node(d)  # Leaves a gap in the ids
+    return graph
+
+def edges_by_label(graph):
+    return sorted((graph.label(node), graph.label(neighbor), weight)
+                  for node in graph for neighbor, weight in graph.edges(node))
+
+def nodes_by_label(graph):
+    return sorted((graph.label(node), graph.position(node)) for node in graph)
+
+def test_edge_list_round_trip(tmp_path):
+    graph = make_graph()
+    path = tmp_path / 'graph.txt'
+    graph_io.save_edge_list(graph, path)
+    loaded = graph_io.load_edge_list(path)
+
+    assert nodes_by_label(loaded) == nodes_by_label(graph)
+    assert edges_by_label(loaded) == edges_by_label(graph)
+    assert sorted(loaded.edge_label(connection) for connection in loaded.connections()) == ['2.5', '4', '7', 'bridge']
+
+def test_edge_list_errors_name_the_line(tmp_path):
+    path = tmp_path / 'graph.txt'
+    path.write_text("node\tA\t0\t0\n# comment\nedge\tA\tB\t1\n")
+    with pytest.raises(ValueError, match=r"graph\.txt:3: unknown node 'B'"):
+        graph_io.load_edge_list(path)
+
+def test_csr_round_trip(tmp_path):
+    graph = make_graph()
+    path = tmp_path / 'graph.csr'
+    graph_io.save_csr(graph, path)
+    with graph_io.load_csr(path) as csr:
+        assert len(csr) == len(graph) and csr.edge_count == graph.edge_count
+        assert nodes_by_label(csr) == nodes_by_label(graph)
+        assert edges_by_label(csr) == edges_by_label(graph)
+        assert csr.heuristic_scale == graph.heuristic_scale
+
+        editable = graph_io.csr_to_graph(csr)
+    assert nodes_by_label(editable) == nodes_by_label(graph)
+    assert edges_by_label(editable) == edges_by_label(graph)
+
+def test_unlabelled_csr_round_trip(tmp_path):
+    csr = generators.random_geometric(300, seed=4)
+    path = tmp_path / 'geometric.csr'
+    graph_io.save_csr(csr, path)
+    with graph_io.load_csr(path) as loaded:
+        assert loaded.labels is None
+        assert list(loaded.xs) == list(csr.xs) and list(loaded.ys) == list(csr.ys)
+        assert list(loaded.offsets) == list(csr.offsets)
+        assert list(loaded.targets) == list(csr.targets)
+        assert list(loaded.weights) == list(csr.weights)
+
+@pytest.mark.parametrize('size', [0, 8, 40, 200, -5, 'extra'])
+def test_truncated_csr_is_rejected(tmp_path, size):
+    path = tmp_path / 'graph.csr'
+    graph_io.save_csr(make_graph(), path)
+    data = path.read_bytes()
+    path.write_bytes(data + b'\0' if size == 'extra' else data[:size])
+    with pytest.raises(ValueError):
+        graph_io.load_csr(path)
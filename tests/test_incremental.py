@@ -0,0 +1,67 @@
+import math
+import random
+
+import pytest
+
+from reference import check_path, dijkstra, random_graph
+from search_engine import IncrementalAStar
+
+def check_result(graph, planner, result):
+    expected = dijkstra(graph, planner.start).get(planner.goal)
+    assert result.found == (expected is not None)
+    if expected is not None:
+        assert math.isclose(result.path_cost, expected)
+        check_path(graph, result.path, planner.start, planner.goal)
+
+def random_edit(graph, rng, keep):
+    # Applies one random edit and returns the nodes update() has to be told about
+    edit = rng.choice(['add', 'add', 'remove', 'reweigh', 'remove node', 'add node'])
+    connections = list(graph.connections())
+    nodes = list(graph)
+    if edit == 'remove' and connections:
+        connection = rng.choice(connections)
+        graph.remove_connection(connection)
+        return graph.endpoints(connection)
+    if edit == 'reweigh' and connections:
+        connection = rng.choice(connections)
+        graph.relabel_connection(connection, str(rng.randint(1, 60)))
+        return graph.endpoints(connection)
+    if edit == 'remove node':
+        node = rng.choice([node for node in nodes if node not in keep])
+        neighbors = graph.neighbors(node)
+        graph.remove_node(node)
+        return [node, *neighbors]
+    if edit == 'add node':
+        node = graph.add_node(f"new{len(graph.labels)}", rng.uniform(0, 100), rng.uniform(0, 100))
+        others = rng.sample(nodes, 2)
+        graph.add_connections((node, other, str(rng.randint(1, 60))) for other in others)
+        return [node, *others]
+    node1, node2 = rng.sample(nodes, 2)
+    graph.add_connection(node1, node2, str(rng.randint(1, 60)))
+    return [node1, node2]
+
+@pytest.mark.parametrize('heuristic', ['euclidean', 'zero', 'alt'])
+@pytest.mark.parametrize('seed', range(10))
+def test_repairs_match_a_fresh_search(seed, heuristic):
+    graph = random_graph(seed, node_count=60, edge_count=120)
+    rng = random.Random(seed)
+    start, goal = rng.sample(list(graph), 2)
+    planner = IncrementalAStar(graph, start, goal, heuristic)
+    check_result(graph, planner, planner.search())
+
+    edits = 40
+    for _ in range(edits):
+        planner.update(random_edit(graph, rng, keep={start, goal}))
+        check_result(graph, planner, planner.search())
+    assert planner.resets < edits // 2  # Most edits were repaired, not searched again from scratch
+
+@pytest.mark.parametrize('seed', range(5))
+def test_unreported_edits_start_over(seed):
+    graph = random_graph(seed, node_count=60, edge_count=120)
+    rng = random.Random(seed)
+    start, goal = rng.sample(list(graph), 2)
+    planner = IncrementalAStar(graph, start, goal)
+    planner.search()
+    for _ in range(10):
+        random_edit(graph, rng, keep={start, goal})  # update() is not called
+        check_result(graph, planner, planner.search())